@@ -0,0 +1,442 @@
+"""
+Dashboard aggregation engine
+Builds every dashboard section from a single grouped query instead of
+re-scanning the user's transactions once per section
+"""
+
+from calendar import month_name
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import Category, MonthlyRollup, Transaction
+from .schemas import (AnalyticsResponse, CategoryBreakdown, FinancialSummary,
+                      MonthlyComparison, RecentTransactionResponse,
+                      TransactionType, TrendData)
+
+# (year, month) -> {"income": float, "expense": float}
+MonthlyTotals = Dict[Tuple[int, int], Dict[str, float]]
+
+
+def build_monthly_comparison(
+    monthly_totals: MonthlyTotals, months: int
+) -> List[MonthlyComparison]:
+    """
+    Turn per-month income/expense totals into the last `months` months
+    that have data, in chronological order - REQ-F-015
+    """
+    comparison = []
+    for (year, month), data in sorted(monthly_totals.items(), reverse=True)[:months]:
+        comparison.append(
+            MonthlyComparison(
+                month=month_name[month],
+                year=year,
+                total_income=data["income"],
+                total_expense=data["expense"],
+                balance=data["income"] - data["expense"],
+            )
+        )
+
+    return list(reversed(comparison))
+
+
+def current_month() -> Tuple[date, date]:
+    """First and last day of the current month, the default analytics period"""
+    today = date.today()
+    start_date = date(today.year, today.month, 1)
+    if today.month == 12:
+        end_date = date(today.year, 12, 31)
+    else:
+        end_date = date(today.year, today.month + 1, 1) - timedelta(days=1)
+    return start_date, end_date
+
+
+def build_financial_summary(
+    totals: Dict[Tuple[int, str], dict], start_date: date, end_date: date
+) -> FinancialSummary:
+    """Income/expense summary from query_category_totals output - REQ-F-013"""
+    total_income = sum(
+        t["total"] for (_, txn_type), t in totals.items() if txn_type == "income"
+    )
+    total_expense = sum(
+        t["total"] for (_, txn_type), t in totals.items() if txn_type == "expense"
+    )
+
+    return FinancialSummary(
+        total_income=total_income,
+        total_expense=total_expense,
+        balance=total_income - total_expense,
+        period_start=start_date,
+        period_end=end_date,
+    )
+
+
+def build_category_breakdown(
+    totals: Dict[Tuple[int, str], dict], transaction_type: Optional[str] = None
+) -> List[CategoryBreakdown]:
+    """
+    Per-category amounts and percentages from query_category_totals output,
+    optionally for one transaction type only - REQ-F-014
+    """
+    # Group by category, as a category only ever holds one transaction type
+    results: Dict[int, dict] = {}
+    for (category_id, txn_type), entry in sorted(totals.items()):
+        if transaction_type and txn_type != transaction_type:
+            continue
+        result = results.setdefault(
+            category_id,
+            {"name": entry["name"], "type": entry["category_type"], "total": 0.0},
+        )
+        result["total"] += entry["total"]
+
+    # Calculate total for percentage
+    total_amount = sum(r["total"] for r in results.values())
+
+    breakdown = []
+    for category_id, result in results.items():
+        percentage = (result["total"] / total_amount * 100) if total_amount > 0 else 0
+        breakdown.append(
+            CategoryBreakdown(
+                category_id=category_id,
+                category_name=result["name"],
+                amount=result["total"],
+                percentage=round(percentage, 2),
+                type=TransactionType(result["type"]),
+            )
+        )
+
+    return breakdown
+
+
+def query_monthly_totals(db: Session, user_id: int) -> MonthlyTotals:
+    """
+    All-time income/expense totals per month for a user, read from rollups
+    """
+    results = (
+        db.query(
+            MonthlyRollup.year,
+            MonthlyRollup.month,
+            MonthlyRollup.type,
+            func.sum(MonthlyRollup.total_amount).label("total"),
+        )
+        .filter(MonthlyRollup.user_id == user_id, MonthlyRollup.transaction_count > 0)
+        .group_by(MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.type)
+        .all()
+    )
+
+    monthly_totals: MonthlyTotals = {}
+    for result in results:
+        key = (result.year, result.month)
+        bucket = monthly_totals.setdefault(key, {"income": 0.0, "expense": 0.0})
+        bucket[result.type] += result.total
+
+    return monthly_totals
+
+
+def month_span(start_date: date, end_date: date):
+    """
+    Split an inclusive date range into whole months and partial edges
+
+    Returns ((first_month_index, last_month_index) or None, [(edge_start, edge_end)]),
+    where a month index is year * 12 + month - 1
+    """
+    if start_date > end_date:
+        return None, []
+
+    first = start_date.year * 12 + start_date.month - 1
+    if start_date.day != 1:
+        first += 1
+
+    last = end_date.year * 12 + end_date.month - 1
+    next_day = date.fromordinal(end_date.toordinal() + 1)
+    if next_day.month == end_date.month:
+        last -= 1
+
+    if first > last:
+        return None, [(start_date, end_date)]
+
+    edges = []
+    first_month_start = date(first // 12, first % 12 + 1, 1)
+    if start_date < first_month_start:
+        edges.append((start_date, date.fromordinal(first_month_start.toordinal() - 1)))
+
+    after_last = last + 1
+    after_last_start = date(after_last // 12, after_last % 12 + 1, 1)
+    if end_date >= after_last_start:
+        edges.append((after_last_start, end_date))
+
+    return (first, last), edges
+
+
+def query_category_totals(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    transaction_type: Optional[str] = None,
+) -> Dict[Tuple[int, str], dict]:
+    """
+    Totals per (category, transaction type) for an inclusive date range
+
+    Whole months are read from monthly rollups; only the partial months at
+    either edge of the range touch raw transactions.
+    """
+    months, edges = month_span(start_date, end_date)
+    queries = []
+
+    if months:
+        month_index = MonthlyRollup.year * 12 + MonthlyRollup.month - 1
+        query = (
+            db.query(
+                Category.id,
+                Category.name,
+                Category.type.label("category_type"),
+                MonthlyRollup.type,
+                func.sum(MonthlyRollup.total_amount).label("total"),
+                func.sum(MonthlyRollup.transaction_count).label("count"),
+            )
+            .join(Category, MonthlyRollup.category_id == Category.id)
+            .filter(
+                MonthlyRollup.user_id == user_id,
+                MonthlyRollup.transaction_count > 0,
+                month_index.between(*months),
+            )
+        )
+        if transaction_type:
+            query = query.filter(MonthlyRollup.type == transaction_type)
+        queries.append(
+            query.group_by(Category.id, Category.name, Category.type, MonthlyRollup.type)
+        )
+
+    for edge_start, edge_end in edges:
+        query = (
+            db.query(
+                Category.id,
+                Category.name,
+                Category.type.label("category_type"),
+                Transaction.type,
+                func.sum(Transaction.amount).label("total"),
+                func.count(Transaction.id).label("count"),
+            )
+            .join(Category, Transaction.category_id == Category.id)
+            .filter(
+                Transaction.user_id == user_id,
+                Transaction.is_deleted == False,
+                Transaction.date >= edge_start,
+                Transaction.date <= edge_end,
+            )
+        )
+        if transaction_type:
+            query = query.filter(Transaction.type == transaction_type)
+        queries.append(
+            query.group_by(Category.id, Category.name, Category.type, Transaction.type)
+        )
+
+    totals: Dict[Tuple[int, str], dict] = {}
+    for query in queries:
+        for row in query.all():
+            entry = totals.setdefault(
+                (row.id, row.type),
+                {
+                    "name": row.name,
+                    "category_type": row.category_type,
+                    "total": 0.0,
+                    "count": 0,
+                },
+            )
+            entry["total"] += row.total
+            entry["count"] += row.count
+
+    return totals
+
+
+def build_dashboard(
+    db: Session,
+    user_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    months: int = 6,
+    recent_limit: int = 10,
+) -> AnalyticsResponse:
+    """
+    Build the complete dashboard for a user
+
+    One grouped query over (date, type, category) feeds the summary, the
+    category breakdown and the trend data. Monthly comparison is derived
+    from the same rows when no date range is given; otherwise it is read from
+    the monthly rollups. Recent transactions are a separate
+    10-row indexed lookup.
+    """
+    base_filters = [
+        Transaction.user_id == user_id,
+        Transaction.is_deleted == False,
+    ]
+    if start_date:
+        base_filters.append(Transaction.date >= start_date)
+    if end_date:
+        base_filters.append(Transaction.date <= end_date)
+
+    rows = (
+        db.query(
+            Transaction.date,
+            Transaction.type,
+            Category.id.label("category_id"),
+            Category.name.label("category_name"),
+            Category.type.label("category_type"),
+            func.sum(Transaction.amount).label("total"),
+            func.count(Transaction.id).label("count"),
+        )
+        .join(Category, Transaction.category_id == Category.id)
+        .filter(*base_filters)
+        .group_by(
+            Transaction.date,
+            Transaction.type,
+            Category.id,
+            Category.name,
+            Category.type,
+        )
+        .all()
+    )
+
+    totals = {"income": 0.0, "expense": 0.0}
+    transaction_count = 0
+    first_date = None
+    last_date = None
+    categories: Dict[int, dict] = {}
+    trend: Dict[Tuple[date, str], float] = {}
+    monthly_totals: MonthlyTotals = {}
+
+    for row in rows:
+        totals[row.type] += row.total
+        transaction_count += row.count
+
+        if first_date is None or row.date < first_date:
+            first_date = row.date
+        if last_date is None or row.date > last_date:
+            last_date = row.date
+
+        category = categories.setdefault(
+            row.category_id,
+            {"name": row.category_name, "type": row.category_type, "total": 0.0},
+        )
+        category["total"] += row.total
+
+        trend[(row.date, row.type)] = trend.get((row.date, row.type), 0.0) + row.total
+
+        month_bucket = monthly_totals.setdefault(
+            (row.date.year, row.date.month), {"income": 0.0, "expense": 0.0}
+        )
+        month_bucket[row.type] += row.total
+
+    summary = FinancialSummary(
+        total_income=totals["income"],
+        total_expense=totals["expense"],
+        balance=totals["income"] - totals["expense"],
+        period_start=first_date or date.today(),
+        period_end=last_date or date.today(),
+        transaction_count=transaction_count,
+    )
+
+    # Percentages are relative to income + expense, as in the breakdown endpoint
+    breakdown_total = sum(c["total"] for c in categories.values())
+    category_breakdown = [
+        CategoryBreakdown(
+            category_id=category_id,
+            category_name=data["name"],
+            amount=data["total"],
+            percentage=(
+                round(data["total"] / breakdown_total * 100, 2)
+                if breakdown_total > 0
+                else 0
+            ),
+            type=TransactionType(data["type"]),
+        )
+        for category_id, data in sorted(categories.items())
+    ]
+
+    trend_data = [
+        TrendData(date=txn_date, amount=amount, type=TransactionType(txn_type))
+        for (txn_date, txn_type), amount in sorted(trend.items())
+    ]
+
+    # Monthly comparison is always all-time, so a date range reads the rollups
+    if start_date or end_date:
+        monthly_totals = query_monthly_totals(db, user_id)
+    monthly_comparison = build_monthly_comparison(monthly_totals, months)
+
+    recent_rows = (
+        db.query(
+            Transaction.id,
+            Transaction.amount,
+            Transaction.description,
+            Transaction.date,
+            Transaction.type,
+            Category.name.label("category_name"),
+        )
+        .join(Category, Transaction.category_id == Category.id)
+        .filter(*base_filters)
+        .order_by(Transaction.date.desc(), Transaction.created_at.desc())
+        .limit(recent_limit)
+        .all()
+    )
+
+    recent_transactions = [
+        RecentTransactionResponse(
+            id=row.id,
+            amount=row.amount,
+            description=row.description,
+            date=row.date,
+            type=TransactionType(row.type),
+            category_name=row.category_name,
+        )
+        for row in recent_rows
+    ]
+
+    return AnalyticsResponse(
+        summary=summary,
+        category_breakdown=category_breakdown,
+        monthly_comparison=monthly_comparison,
+        trend_data=trend_data,
+        recent_transactions=recent_transactions,
+    )
+
+
+def query_trend_data(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    type: Optional[TransactionType] = None,
+) -> List[TrendData]:
+    """
+    Daily income/expense totals for an inclusive date range - REQ-F-016
+    """
+    query = db.query(
+        Transaction.date, Transaction.type, func.sum(Transaction.amount).label("total")
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.is_deleted == False,
+        Transaction.date >= start_date,
+        Transaction.date <= end_date,
+    )
+
+    if type:
+        query = query.filter(Transaction.type == type.value)
+
+    results = (
+        query.group_by(Transaction.date, Transaction.type)
+        .order_by(Transaction.date)
+        .all()
+    )
+
+    trend = []
+    for result in results:
+        trend.append(
+            TrendData(
+                date=result.date, amount=result.total, type=TransactionType(result.type)
+            )
+        )
+
+    return trend
@@ -0,0 +1,140 @@
+"""
+Conversation history stores for the chatbot
+MemoryHistoryStore keeps a bounded per-process LRU with an idle TTL;
+DatabaseHistoryStore appends to the chat_messages table so every worker
+sees the same context and it survives restarts
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache
+from .config import settings
+from .models import ChatMessage
+
+
+class HistoryStore:
+    """
+    Interface: the last `max_messages` messages per user, oldest first, as
+    {"role": ..., "message": ...} dicts. Users idle for longer than
+    `idle_ttl` seconds start with an empty history
+    """
+
+    name = "base"
+
+    def __init__(self, max_messages: int, idle_ttl: float):
+        self.max_messages = max_messages
+        self.idle_ttl = idle_ttl
+
+    def get(self, db: Session, user_id: int) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+    def append(self, db: Session, user_id: int, role: str, message: str):
+        raise NotImplementedError
+
+    def clear(self, db: Session, user_id: int):
+        raise NotImplementedError
+
+
+class MemoryHistoryStore(HistoryStore):
+    """
+    Per-process history, at most `max_users` users before LRU eviction
+    Appends run on the event loop thread, so read-modify-write is safe
+    """
+
+    name = "memory"
+
+    def __init__(self, max_messages: int, idle_ttl: float, max_users: int):
+        super().__init__(max_messages, idle_ttl)
+        self._cache = TTLCache(max_users, idle_ttl)
+
+    def get(self, db: Session, user_id: int) -> List[Dict[str, str]]:
+        return list(self._cache.get(user_id) or ())
+
+    def append(self, db: Session, user_id: int, role: str, message: str):
+        messages = (self._cache.get(user_id) or ()) + (
+            {"role": role, "message": message},
+        )
+        # Re-setting the entry restarts its idle TTL
+        self._cache.set(user_id, messages[-self.max_messages:])
+
+    def clear(self, db: Session, user_id: int):
+        self._cache.delete(user_id)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class DatabaseHistoryStore(HistoryStore):
+    """
+    History in the chat_messages table
+    Writes are plain INSERTs; reads take the newest rows inside the idle
+    window, and expired rows are pruned at most once per `prune_interval`
+    """
+
+    name = "database"
+
+    def __init__(self, max_messages: int, idle_ttl: float, prune_interval: float = 3600):
+        super().__init__(max_messages, idle_ttl)
+        self.prune_interval = prune_interval
+        # The first append of each process prunes
+        self._last_prune = float("-inf")
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.idle_ttl)
+
+    def get(self, db: Session, user_id: int) -> List[Dict[str, str]]:
+        rows = (
+            db.query(ChatMessage.role, ChatMessage.message)
+            .filter(
+                ChatMessage.user_id == user_id,
+                ChatMessage.created_at >= self._cutoff(),
+            )
+            .order_by(ChatMessage.id.desc())
+            .limit(self.max_messages)
+            .all()
+        )
+        return [{"role": role, "message": message} for role, message in reversed(rows)]
+
+    def append(self, db: Session, user_id: int, role: str, message: str):
+        db.add(ChatMessage(user_id=user_id, role=role, message=message))
+        db.commit()
+
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self.prune(db)
+
+    def clear(self, db: Session, user_id: int):
+        db.query(ChatMessage).filter(ChatMessage.user_id == user_id).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+    def prune(self, db: Session) -> int:
+        """Delete messages older than the idle window, returning the row count"""
+        self._last_prune = time.monotonic()
+        deleted = (
+            db.query(ChatMessage)
+            .filter(ChatMessage.created_at < self._cutoff())
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+def create_history_store() -> HistoryStore:
+    """Build the store selected by CHAT_HISTORY_BACKEND"""
+    if settings.chat_history_backend == "memory":
+        return MemoryHistoryStore(
+            settings.chat_history_max_messages,
+            settings.chat_history_idle_ttl_seconds,
+            settings.chat_history_max_users,
+        )
+    if settings.chat_history_backend == "database":
+        return DatabaseHistoryStore(
+            settings.chat_history_max_messages,
+            settings.chat_history_idle_ttl_seconds,
+        )
+    raise ValueError(f"Unknown CHAT_HISTORY_BACKEND: {settings.chat_history_backend}")
@@ -3,41 +3,114 @@ Chatbot service using Google Gemini AI for financial advice and analysis
 Agent-based with tool calling for smart database access
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Callable
+import asyncio
+import logging
+import threading
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Any, AsyncIterator, List, Callable, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, extract, func
 import json
 
-try:
-    import google.genai as genai
-except ImportError:
-    genai = None
-
-from .models import Transaction
+from .analytics_service import query_category_totals
+from .cache import TTLCache
+from .chat_history import create_history_store
+from .intent import Intent, classify_intent
+from .models import Category, Transaction
 from .config import settings
+from .rollups import get_data_version
+from .llm_backends import LLMBackend, create_llm_backend
+
+GREETING_RESPONSE = "Xin chào! Mình là Fin - trợ lý tài chính của bạn 😊\n\nMình có thể giúp bạn:\n- Chat về bất cứ điều gì\n- Tư vấn tài chính cá nhân\n- Phân tích chi tiêu của bạn\n- Gợi ý cách tiết kiệm thông minh\n\nHôm nay bạn muốn trò chuyện về gì? 💬"
+TIMEOUT_RESPONSE = "Xin lỗi, mình đang phản hồi hơi chậm. Bạn thử hỏi lại sau ít phút nhé! 🙏"
+ERROR_RESPONSE = "Xin lỗi, mình gặp chút vấn đề kỹ thuật. Bạn thử hỏi lại được không? 😅"
+
+logger = logging.getLogger(__name__)
+
+# Financial snapshots per user: {"version": data_version, "snapshots": {(days, day): data}}
+financial_snapshot_cache = TTLCache(
+    settings.chat_snapshot_cache_max_size, settings.chat_snapshot_cache_ttl_seconds
+)
+
+# Answers keyed by normalized question: ("general", text) is shared by all
+# users, ("personal", user_id, data_version, day, text) is per user
+chat_response_cache = TTLCache(
+    settings.chat_response_cache_max_size, settings.chat_response_cache_ttl_seconds
+)
+
+# Shorter messages tend to lean on the conversation ("Có", "Thế nào?")
+MIN_CACHEABLE_WORDS = 3
+
+WEEKDAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def invalidate_financial_snapshots(user_id: int):
+    """Drop cached snapshots of a user whose id may be reused, e.g. on delete"""
+    financial_snapshot_cache.delete(user_id)
+
+
+@dataclass
+class AgentUsage:
+    """Per-turn accounting of agent steps, tool calls, tokens and latency"""
+    steps: int = 0
+    llm_calls: int = 0
+    tool_calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: float = 0.0
+    cached: bool = False
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
+    
+    def record(self, response: Any):
+        """Add the token usage reported with an LLM response"""
+        self.llm_calls += 1
+        metadata = getattr(response, 'usage_metadata', None)
+        if metadata is not None:
+            self.prompt_tokens += getattr(metadata, 'prompt_token_count', None) or 0
+            self.output_tokens += getattr(metadata, 'candidates_token_count', None) or 0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'steps': self.steps,
+            'llm_calls': self.llm_calls,
+            'tool_calls': self.tool_calls,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'total_tokens': self.total_tokens,
+            'latency_ms': round(self.latency_ms, 1),
+            'cached': self.cached
+        }
+
+
+@dataclass(frozen=True)
+class ChatContext:
+    """
+    Per-request state for tool execution
+    Passed explicitly so concurrent chats never share a session or user
+    """
+    db: Session
+    user_id: int
 
 
 class FinancialChatbot:
     """AI-powered financial chatbot using Google Gemini"""
     
-    def __init__(self):
-        """Initialize the chatbot with Gemini AI"""
-        if genai is None:
-            raise ImportError("google-genai package is required. Install with: pip install google-genai")
-        
-        if not settings.gemini_api_key:
-            raise ValueError("GEMINI_API_KEY is required in environment variables")
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        """Initialize the chatbot with an LLM backend (Gemini by default)"""
+        self.backend = backend or create_llm_backend()
         
-        # Configure Gemini AI
-        self.client = genai.Client(api_key=settings.gemini_api_key)
+        # Concurrency limiter for LLM calls, bound to the running event loop
+        self._limiter = None
+        self._limiter_loop = None
         
-        # Database session and user_id for agent tools
-        self.db = None
-        self.user_id = None
-        
-        # Conversation history per user
-        self.conversation_history = {}
+        # Conversation history per user, bounded and optionally shared
+        self.history = create_history_store()
         
         # Define available tools for the agent
         self.tools = self._define_tools()
@@ -129,6 +202,46 @@ class FinancialChatbot:
         Hãy là một người bạn tốt, không chỉ là chatbot! 🤗
         """
     
+    def _get_limiter(self) -> asyncio.Semaphore:
+        """Semaphore capping in-flight LLM calls - LLM_MAX_CONCURRENCY"""
+        loop = asyncio.get_running_loop()
+        if self._limiter_loop is not loop:
+            self._limiter = asyncio.Semaphore(settings.llm_max_concurrency)
+            self._limiter_loop = loop
+        return self._limiter
+    
+    async def _generate(self, contents: Any, config: Optional[dict] = None) -> Any:
+        """
+        Call the LLM without blocking the event loop
+        Waits for a limiter slot, then raises asyncio.TimeoutError after
+        LLM_TIMEOUT_SECONDS
+        """
+        async with self._get_limiter():
+            return await asyncio.wait_for(
+                self.backend.generate(contents, config),
+                timeout=settings.llm_timeout_seconds,
+            )
+    
+    async def _stream(self, contents: Any, config: Optional[dict] = None) -> AsyncIterator[Any]:
+        """
+        Stream LLM chunks while holding a limiter slot
+        Raises asyncio.TimeoutError when the next chunk takes longer than
+        LLM_TIMEOUT_SECONDS
+        """
+        async with self._get_limiter():
+            chunks = self.backend.stream(contents, config).__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            chunks.__anext__(), timeout=settings.llm_timeout_seconds
+                        )
+                    except StopAsyncIteration:
+                        return
+                    yield chunk
+            finally:
+                await chunks.aclose()
+    
     def _define_tools(self) -> List[Dict[str, Any]]:
         """Define tools available for the agent"""
         return [
@@ -198,12 +311,12 @@ class FinancialChatbot:
             }
         ]
     
-    def _execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+    def _execute_tool(self, context: ChatContext, tool_name: str, parameters: Dict[str, Any]) -> str:
         """Execute a tool and return the result"""
         try:
             if tool_name == "get_financial_summary":
                 days = parameters.get("days", 30)
-                data = self.get_user_financial_data(self.db, self.user_id, days)
+                data = self.get_user_financial_data(context.db, context.user_id, days)
                 return json.dumps({
                     "total_income": data['total_income'],
                     "total_expense": data['total_expense'],
@@ -215,8 +328,8 @@ class FinancialChatbot:
             elif tool_name == "get_top_expenses":
                 days = parameters.get("days", 30)
                 limit = parameters.get("limit", 5)
-                data = self.get_user_financial_data(self.db, self.user_id, days)
-                top_categories = data['top_expense_categories'][:limit]
+                data = self.get_user_financial_data(context.db, context.user_id, days)
+                top_categories = data['expense_categories'][:limit]
                 return json.dumps({
                     "top_expenses": [{"category": cat, "amount": amt} for cat, amt in top_categories]
                 }, ensure_ascii=False)
@@ -224,10 +337,10 @@ class FinancialChatbot:
             elif tool_name == "get_category_expense":
                 category_name = parameters.get("category_name")
                 days = parameters.get("days", 30)
-                data = self.get_user_financial_data(self.db, self.user_id, days)
+                data = self.get_user_financial_data(context.db, context.user_id, days)
                 
-                # Find category in top expenses
-                for cat, amt in data['top_expense_categories']:
+                # Find category among all expense categories
+                for cat, amt in data['expense_categories']:
                     if category_name.lower() in cat.lower() or cat.lower() in category_name.lower():
                         return json.dumps({
                             "category": cat,
@@ -243,7 +356,7 @@ class FinancialChatbot:
             
             elif tool_name == "get_spending_analysis":
                 days = parameters.get("days", 30)
-                data = self.get_user_financial_data(self.db, self.user_id, days)
+                data = self.get_user_financial_data(context.db, context.user_id, days)
                 analysis = self.analyze_spending_patterns(data)
                 recommendations = self.get_budget_recommendations(data)
                 return json.dumps({
@@ -262,69 +375,141 @@ class FinancialChatbot:
         except Exception as e:
             return json.dumps({"error": str(e)}, ensure_ascii=False)
     
-    def get_user_financial_data(self, db: Session, user_id: int, days: int = 30) -> Dict[str, Any]:
-        """Lấy dữ liệu tài chính của người dùng trong khoảng thời gian nhất định"""
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days)
+    def get_user_financial_data(
+        self,
+        db: Session,
+        user_id: int,
+        days: int = 30,
+        sample_limit: int = 0,
+        sample_offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Lấy dữ liệu tài chính của người dùng trong khoảng thời gian nhất định
+        Aggregates come from _financial_snapshot; `transactions` holds at
+        most `sample_limit` of the most recent transactions, starting at
+        `sample_offset`
+        """
+        data = dict(self._financial_snapshot(db, user_id, days))
+        
+        transactions = []
+        if sample_limit > 0:
+            end_date = date.today()
+            start_date = end_date - timedelta(days=days)
+            sample = db.query(
+                Transaction.date,
+                Transaction.amount,
+                Transaction.type,
+                Transaction.description,
+                Category.name.label('category'),
+                Transaction.notes
+            ).join(
+                Category, Transaction.category_id == Category.id
+            ).filter(
+                and_(
+                    Transaction.user_id == user_id,
+                    Transaction.date >= start_date,
+                    Transaction.date <= end_date,
+                    Transaction.is_deleted == False
+                )
+            ).order_by(
+                Transaction.date.desc(), Transaction.id.desc()
+            ).offset(sample_offset).limit(sample_limit).all()
+            
+            transactions = [
+                {
+                    'date': t.date.isoformat(),
+                    'amount': t.amount,
+                    'type': t.type,
+                    'description': t.description,
+                    'category': t.category,
+                    'notes': t.notes
+                } for t in sample
+            ]
         
-        # Lấy tất cả giao dịch trong khoảng thời gian
-        transactions = db.query(Transaction).filter(
-            and_(
-                Transaction.user_id == user_id,
-                Transaction.date >= start_date,
-                Transaction.date <= end_date,
-                Transaction.is_deleted == False
-            )
-        ).all()
+        data.update({
+            'transactions': transactions,
+            'transactions_offset': sample_offset,
+            'transactions_limit': sample_limit
+        })
+        return data
+    
+    def _financial_snapshot(self, db: Session, user_id: int, days: int) -> Dict[str, Any]:
+        """
+        Aggregates for a window, cached per (user, data version, days, day)
+        Transaction writes bump the user's data version, which drops every
+        cached window of that user
+        """
+        version = get_data_version(db, user_id)
+        today = date.today()
+        
+        entry = financial_snapshot_cache.get(user_id)
+        if entry is None or entry['version'] != version:
+            entry = {'version': version, 'snapshots': {}}
+            financial_snapshot_cache.set(user_id, entry)
+        
+        snapshot = entry['snapshots'].get((days, today))
+        if snapshot is None:
+            snapshot = self._compute_financial_snapshot(db, user_id, days, today)
+            entry['snapshots'][(days, today)] = snapshot
+        return snapshot
+    
+    def _compute_financial_snapshot(self, db: Session, user_id: int, days: int, today: date) -> Dict[str, Any]:
+        """
+        Totals, per-category and per-weekday sums from grouped SQL aggregates,
+        so cost does not grow with the number of rows
+        """
+        end_date = today
+        start_date = end_date - timedelta(days=days)
         
-        # Tính toán thống kê
-        total_income = sum(t.amount for t in transactions if t.type == 'income')
-        total_expense = sum(t.amount for t in transactions if t.type == 'expense')
-        net_balance = total_income - total_expense
+        # Tổng theo danh mục và loại giao dịch (rollups + hai tháng ở biên)
+        category_totals = query_category_totals(db, user_id, start_date, end_date)
         
-        # Phân tích theo danh mục
+        total_income = 0.0
+        total_expense = 0.0
+        transaction_count = 0
         category_analysis = {}
-        for transaction in transactions:
-            if transaction.type == 'expense':
-                category_name = transaction.category.name
-                if category_name not in category_analysis:
-                    category_analysis[category_name] = 0
-                category_analysis[category_name] += transaction.amount
-        
-        # Top 5 danh mục chi tiêu nhiều nhất
-        top_expense_categories = sorted(
+        for (_, txn_type), entry in category_totals.items():
+            transaction_count += entry['count']
+            if txn_type == 'income':
+                total_income += entry['total']
+            else:
+                total_expense += entry['total']
+                category_analysis[entry['name']] = (
+                    category_analysis.get(entry['name'], 0) + entry['total']
+                )
+        
+        expense_categories = sorted(
             category_analysis.items(), 
             key=lambda x: x[1], 
             reverse=True
-        )[:5]
-        
-        # Phân tích theo ngày trong tuần
-        daily_expenses = {}
-        for transaction in transactions:
-            if transaction.type == 'expense':
-                day_name = transaction.date.strftime('%A')
-                if day_name not in daily_expenses:
-                    daily_expenses[day_name] = 0
-                daily_expenses[day_name] += transaction.amount
+        )
+        
+        # Phân tích theo ngày trong tuần (0 = Chủ nhật, như strftime('%w'))
+        weekday = extract('dow', Transaction.date)
+        weekday_rows = db.query(
+            weekday.label('weekday'),
+            func.sum(Transaction.amount).label('total')
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.type == 'expense',
+            Transaction.is_deleted == False,
+            Transaction.date >= start_date,
+            Transaction.date <= end_date
+        ).group_by(weekday).all()
+        daily_expenses = {
+            WEEKDAY_NAMES[int(row.weekday)]: row.total for row in weekday_rows
+        }
         
         return {
             'period': f"{days} ngày gần nhất",
             'total_income': total_income,
             'total_expense': total_expense,
-            'net_balance': net_balance,
-            'transaction_count': len(transactions),
-            'top_expense_categories': top_expense_categories,
-            'daily_expenses': daily_expenses,
-            'transactions': [
-                {
-                    'date': t.date.isoformat(),
-                    'amount': t.amount,
-                    'type': t.type,
-                    'description': t.description,
-                    'category': t.category.name,
-                    'notes': t.notes
-                } for t in transactions
-            ]
+            'net_balance': total_income - total_expense,
+            'transaction_count': transaction_count,
+            # Top 5 danh mục chi tiêu nhiều nhất
+            'top_expense_categories': expense_categories[:5],
+            'expense_categories': expense_categories,
+            'daily_expenses': daily_expenses
         }
     
     def analyze_spending_patterns(self, financial_data: Dict[str, Any]) -> str:
@@ -353,34 +538,12 @@ class FinancialChatbot:
         
         return "\n".join(analysis)
     
-    def _get_conversation_history(self, user_id: int) -> List[Dict[str, str]]:
-        """Lấy lịch sử trò chuyện của user"""
-        if user_id not in self.conversation_history:
-            self.conversation_history[user_id] = []
-        return self.conversation_history[user_id]
-    
-    def _add_to_history(self, user_id: int, role: str, message: str):
-        """Thêm tin nhắn vào lịch sử"""
-        if user_id not in self.conversation_history:
-            self.conversation_history[user_id] = []
-        
-        self.conversation_history[user_id].append({
-            "role": role,
-            "message": message
-        })
-        
-        # Giới hạn lịch sử chỉ giữ 10 tin nhắn gần nhất (5 cặp hỏi-đáp)
-        if len(self.conversation_history[user_id]) > 10:
-            self.conversation_history[user_id] = self.conversation_history[user_id][-10:]
-    
-    def _clear_history(self, user_id: int):
+    def clear_history(self, db: Session, user_id: int):
         """Xóa lịch sử trò chuyện"""
-        if user_id in self.conversation_history:
-            self.conversation_history[user_id] = []
+        self.history.clear(db, user_id)
     
-    def _format_history_for_prompt(self, user_id: int) -> str:
+    def _format_history_for_prompt(self, history: Optional[List[Dict[str, str]]]) -> str:
         """Format lịch sử thành chuỗi cho prompt"""
-        history = self._get_conversation_history(user_id)
         if not history:
             return ""
         
@@ -391,58 +554,11 @@ class FinancialChatbot:
         
         return formatted
     
-    def _is_simple_greeting(self, message: str) -> bool:
-        """Kiểm tra xem có phải câu chào hỏi đơn giản không"""
-        simple_patterns = [
-            'chào', 'hello', 'hi', 'hey', 'xin chào',
-            'chào bạn', 'hế nhô', 'hế lô', 'alo'
-        ]
-        message_lower = message.lower().strip()
-        return any(pattern in message_lower for pattern in simple_patterns) and len(message.split()) <= 3
-    
-    def _is_finance_related(self, message: str) -> bool:
-        """Kiểm tra xem câu hỏi có liên quan đến tài chính không"""
-        finance_keywords = [
-            'tiền', 'chi', 'thu', 'tiêu', 'tiết kiệm', 'đầu tư',
-            'thu nhập', 'chi tiêu', 'ngân sách', 'lương', 'tài chính',
-            'quản lý', 'phân tích', 'danh mục', 'giao dịch'
-        ]
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in finance_keywords)
-    
-    def _is_general_question(self, message: str) -> bool:
-        """Kiểm tra xem có phải câu hỏi chung không cần dữ liệu"""
-        # Nếu không liên quan đến tài chính → câu hỏi chung
-        if not self._is_finance_related(message):
-            return True
-        
-        general_keywords = [
-            'làm sao', 'làm thế nào', 'cách nào', 'phương pháp',
-            'là gì', 'giải thích', 'định nghĩa',
-            'lời khuyên chung', 'nên làm gì', 'tôi nên'
-        ]
-        data_keywords = [
-            'chi bao nhiêu', 'thu nhập của tôi', 'phân tích chi tiêu của tôi',
-            'top chi tiêu', 'danh mục của tôi', 'số liệu của tôi', 'dữ liệu của tôi',
-            'tháng này của tôi', 'tháng trước của tôi'
-        ]
-        
-        message_lower = message.lower()
-        has_general = any(keyword in message_lower for keyword in general_keywords)
-        has_data = any(keyword in message_lower for keyword in data_keywords)
-        
-        # Nếu có từ khóa chung và không có từ khóa dữ liệu → câu hỏi chung
-        return has_general and not has_data
-    
-    def _answer_general_question(self, question: str, user_id: int = None) -> str:
-        """Trả lời câu hỏi chung không cần dữ liệu - Conversational style with history"""
-        
-        # Lấy lịch sử nếu có user_id
-        history_context = ""
-        if user_id:
-            history_context = self._format_history_for_prompt(user_id)
+    def _general_question_prompt(self, question: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Prompt cho câu hỏi chung, kèm lịch sử trò chuyện"""
+        history_context = self._format_history_for_prompt(history)
         
-        prompt = f"""
+        return f"""
         Bạn là Fin - một AI thân thiện đang chat với người dùng.
         {history_context}
         
@@ -464,35 +580,22 @@ class FinancialChatbot:
         
         Hãy trả lời tự nhiên, nhớ ngữ cảnh và thân thiện!
         """
-        
+    
+    async def _answer_general_question(
+        self, question: str, history: Optional[List[Dict[str, str]]] = None, usage: Optional[AgentUsage] = None
+    ) -> str:
+        """Trả lời câu hỏi chung không cần dữ liệu - Conversational style with history"""
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
+            response = await self._generate(self._general_question_prompt(question, history))
+            if usage is not None:
+                usage.record(response)
             return response.text.strip()
         except Exception as e:
-            return f"Xin lỗi, mình gặp chút vấn đề kỹ thuật. Bạn thử hỏi lại được không? 😅"
+            return ERROR_RESPONSE
     
-    def generate_financial_advice_with_agent(self, user_question: str, db: Session, user_id: int) -> str:
-        """
-        Tạo lời khuyên tài chính sử dụng AI Agent với tool calling
-        Agent sẽ tự quyết định khi nào cần truy vấn database
-        """
-        # Set database context for tools
-        self.db = db
-        self.user_id = user_id
-        
-        # Quick response for simple greetings
-        if self._is_simple_greeting(user_question):
-            return "Xin chào! Mình là Fin - trợ lý tài chính của bạn 😊\n\nMình có thể giúp bạn:\n- Chat về bất cứ điều gì\n- Tư vấn tài chính cá nhân\n- Phân tích chi tiêu của bạn\n- Gợi ý cách tiết kiệm thông minh\n\nHôm nay bạn muốn trò chuyện về gì? 💬"
-        
-        # Direct answer for general questions (no tools needed)
-        if self._is_general_question(user_question):
-            return self._answer_general_question(user_question, user_id)
-        
-        # Prepare the prompt for the agent
-        full_prompt = f"""
+    def _agent_prompt(self, user_question: str) -> str:
+        """Prompt cho agent có quyền gọi tools"""
+        return f"""
         {self.system_prompt}
         
         Câu hỏi: {user_question}
@@ -503,61 +606,261 @@ class FinancialChatbot:
         - KHÔNG dùng ** để in đậm
         - Tập trung vào câu hỏi
         """
+    
+    def _agent_config(self, mode: str = "AUTO") -> Dict[str, Any]:
+        """
+        Tool declarations for an agent step
+        The final step keeps them, as its contents replay earlier function
+        calls, and uses mode "NONE" to force a text answer
+        """
+        return {
+            "tools": [{"function_declarations": self.tools}] if self.tools else None,
+            "tool_config": {"function_calling_config": {"mode": mode}}
+        }
+    
+    @staticmethod
+    def _function_calls(response: Any) -> List[Any]:
+        """Function calls requested in a response or stream chunk"""
+        calls = []
+        for candidate in getattr(response, 'candidates', None) or []:
+            content = getattr(candidate, 'content', None)
+            for part in getattr(content, 'parts', None) or []:
+                if getattr(part, 'function_call', None):
+                    calls.append(part.function_call)
+        return calls
+    
+    @staticmethod
+    def _tool_turn(function_calls: List[Any], tool_results: List[str]) -> List[Dict[str, Any]]:
+        """Model turn with every function call, then one user turn with every result"""
+        return [
+            {
+                "role": "model",
+                "parts": [{"function_call": call} for call in function_calls]
+            },
+            {
+                "role": "user",
+                "parts": [
+                    {
+                        "function_response": {
+                            "name": call.name,
+                            "response": {"result": result}
+                        }
+                    }
+                    for call, result in zip(function_calls, tool_results)
+                ]
+            }
+        ]
+    
+    async def _run_tools(self, context: ChatContext, function_calls: List[Any], usage: AgentUsage) -> List[str]:
+        """
+        Run every function call of one model turn concurrently
+        Each call runs in a worker thread with its own session on the
+        request's engine, as sessions must not be shared across threads,
+        and the event loop stays free for other chats meanwhile
+        """
+        bind = context.db.get_bind()
+        
+        def run(call) -> str:
+            with Session(bind=bind) as db:
+                return self._execute_tool(
+                    ChatContext(db=db, user_id=context.user_id), call.name, dict(call.args or {})
+                )
+        
+        usage.tool_calls += len(function_calls)
+        return list(await asyncio.gather(*(asyncio.to_thread(run, call) for call in function_calls)))
+    
+    def _response_cache_key(self, db: Session, user_id: int, intent: Intent) -> Optional[Tuple]:
+        """Cache key for the answer to a question, or None if it is not cacheable"""
+        if len(intent.normalized.split()) < MIN_CACHEABLE_WORDS:
+            return None
+        if intent.general:
+            return ("general", intent.normalized)
+        return ("personal", user_id, get_data_version(db, user_id), date.today(), intent.normalized)
+    
+    @staticmethod
+    def _store_response(
+        cache_key: Optional[Tuple], answer: str, history: Optional[List[Dict[str, str]]]
+    ):
+        """
+        Cache a successful answer
+        General answers are shared across users, so only those generated
+        without earlier turns in the prompt are stored
+        """
+        if cache_key is None or not answer or answer in (TIMEOUT_RESPONSE, ERROR_RESPONSE):
+            return
+        # The history ends with the current message
+        if cache_key[0] == "general" and len(history or []) > 1:
+            return
+        chat_response_cache.set(cache_key, answer)
+    
+    def _agent_budget_left(self, usage: AgentUsage) -> bool:
+        return (
+            usage.steps < settings.chat_agent_max_steps
+            and usage.total_tokens < settings.chat_agent_token_budget
+        )
+    
+    async def generate_financial_advice_with_agent(
+        self,
+        user_question: str,
+        db: Session,
+        user_id: int,
+        usage: Optional[AgentUsage] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        intent: Optional[Intent] = None
+    ) -> str:
+        """
+        Tạo lời khuyên tài chính sử dụng AI Agent với tool calling
+        Agent sẽ tự quyết định khi nào cần truy vấn database
+        
+        Each step sends the conversation so far; all function calls of a step
+        run together and their results go back in one follow-up. The loop
+        stops at CHAT_AGENT_MAX_STEPS or CHAT_AGENT_TOKEN_BUDGET, after which
+        the model answers without tools. `usage` collects the accounting,
+        `history` is the conversation so far, used for general questions,
+        and `intent` is the message's classification when already known
+        
+        Answers are served from chat_response_cache when the normalized
+        question was answered before (for personal questions, at the same
+        data version)
+        """
+        usage = usage if usage is not None else AgentUsage()
+        intent = intent or classify_intent(user_question)
+        started = time.perf_counter()
+        
+        # Request-scoped context for tools
+        context = ChatContext(db=db, user_id=user_id)
         
         try:
-            # Try to use function calling if supported
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=full_prompt,
-                config={
-                    "tools": [{"function_declarations": self.tools}] if self.tools else None,
-                    "tool_config": {"function_calling_config": {"mode": "AUTO"}}
-                }
-            )
+            # Quick response for simple greetings
+            if intent.greeting:
+                return GREETING_RESPONSE
             
-            # Check if model wants to use tools
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                    for part in candidate.content.parts:
-                        if hasattr(part, 'function_call'):
-                            # Execute the tool
-                            function_call = part.function_call
-                            tool_result = self._execute_tool(
-                                function_call.name,
-                                dict(function_call.args)
-                            )
-                            
-                            # Send tool result back to model
-                            final_response = self.client.models.generate_content(
-                                model="gemini-2.5-flash",
-                                contents=[
-                                    full_prompt,
-                                    {
-                                        "role": "model",
-                                        "parts": [{"function_call": function_call}]
-                                    },
-                                    {
-                                        "role": "user",
-                                        "parts": [{
-                                            "function_response": {
-                                                "name": function_call.name,
-                                                "response": {"result": tool_result}
-                                            }
-                                        }]
-                                    }
-                                ]
-                            )
-                            return final_response.text
+            cache_key = self._response_cache_key(db, user_id, intent)
+            if cache_key is not None:
+                cached = chat_response_cache.get(cache_key)
+                if cached is not None:
+                    usage.cached = True
+                    return cached
             
-            # No tool call needed, return direct response
-            return response.text
+            # Direct answer for general questions (no tools needed)
+            if intent.general:
+                answer = await self._answer_general_question(user_question, history, usage)
+                self._store_response(cache_key, answer, history)
+                return answer
             
-        except Exception as e:
-            # Fallback: If tool calling fails, use simple approach
-            return self._fallback_response(user_question, db, user_id, str(e))
+            try:
+                answer = await self._run_agent(user_question, context, usage)
+            except asyncio.TimeoutError:
+                return TIMEOUT_RESPONSE
+            except Exception as e:
+                # Fallback: If tool calling fails, use simple approach
+                return await self._fallback_response(user_question, db, user_id, str(e))
+            
+            self._store_response(cache_key, answer, history)
+            return answer
+        finally:
+            usage.latency_ms = (time.perf_counter() - started) * 1000
     
-    def _fallback_response(self, user_question: str, db: Session, user_id: int, error: str = "") -> str:
+    async def _run_agent(self, user_question: str, context: ChatContext, usage: AgentUsage) -> str:
+        """The tool-calling loop of generate_financial_advice_with_agent"""
+        contents: List[Any] = [self._agent_prompt(user_question)]
+        
+        while self._agent_budget_left(usage):
+            usage.steps += 1
+            response = await self._generate(contents, config=self._agent_config())
+            usage.record(response)
+            
+            function_calls = self._function_calls(response)
+            if not function_calls:
+                return response.text
+            
+            tool_results = await self._run_tools(context, function_calls, usage)
+            contents = contents + self._tool_turn(function_calls, tool_results)
+        
+        # Budget spent: answer from the tool results gathered so far
+        response = await self._generate(contents, config=self._agent_config("NONE"))
+        usage.record(response)
+        return response.text
+    
+    async def stream_financial_advice_with_agent(
+        self,
+        user_question: str,
+        db: Session,
+        user_id: int,
+        usage: Optional[AgentUsage] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        intent: Optional[Intent] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming version of generate_financial_advice_with_agent
+        Text is yielded as the model produces it; function calls collected
+        from a step run together and the next step is streamed in turn
+        """
+        usage = usage if usage is not None else AgentUsage()
+        intent = intent or classify_intent(user_question)
+        started = time.perf_counter()
+        context = ChatContext(db=db, user_id=user_id)
+        
+        try:
+            if intent.greeting:
+                yield GREETING_RESPONSE
+                return
+            
+            cache_key = self._response_cache_key(db, user_id, intent)
+            if cache_key is not None:
+                cached = chat_response_cache.get(cache_key)
+                if cached is not None:
+                    usage.cached = True
+                    yield cached
+                    return
+            
+            if intent.general:
+                contents: List[Any] = [self._general_question_prompt(user_question, history)]
+                config = None
+            else:
+                contents = [self._agent_prompt(user_question)]
+                config = self._agent_config()
+            
+            parts = []
+            # General questions are answered in one call without tools
+            final = config is None
+            try:
+                while True:
+                    if not final and not self._agent_budget_left(usage):
+                        # Budget spent: answer from the tool results so far
+                        config = self._agent_config("NONE")
+                        final = True
+                    if not final:
+                        usage.steps += 1
+                    
+                    function_calls = []
+                    last_chunk = None
+                    async with aclosing(self._stream(contents, config)) as chunks:
+                        async for chunk in chunks:
+                            last_chunk = chunk
+                            calls = self._function_calls(chunk)
+                            if calls:
+                                function_calls += calls
+                            elif chunk.text:
+                                parts.append(chunk.text)
+                                yield chunk.text
+                    usage.record(last_chunk)
+                    
+                    if not function_calls:
+                        self._store_response(cache_key, "".join(parts), history)
+                        return
+                    
+                    tool_results = await self._run_tools(context, function_calls, usage)
+                    contents = contents + self._tool_turn(function_calls, tool_results)
+            
+            except asyncio.TimeoutError:
+                yield TIMEOUT_RESPONSE
+            except Exception:
+                yield ERROR_RESPONSE
+        finally:
+            usage.latency_ms = (time.perf_counter() - started) * 1000
+    
+    async def _fallback_response(self, user_question: str, db: Session, user_id: int, error: str = "") -> str:
         """Fallback response when agent fails"""
         try:
             # Get financial data directly
@@ -583,15 +886,12 @@ class FinancialChatbot:
             Hãy đưa ra lời khuyên ngắn gọn và hữu ích.
             """
             
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
+            response = await self._generate(prompt)
             return response.text
         except Exception as e:
             return f"Xin lỗi, tôi gặp lỗi khi xử lý yêu cầu của bạn: {str(e)}"
     
-    def generate_financial_advice(self, financial_data: Dict[str, Any], user_question: str = "") -> str:
+    async def generate_financial_advice(self, financial_data: Dict[str, Any], user_question: str = "") -> str:
         """Legacy method - kept for backward compatibility"""
         data_summary = f"""
         Dữ liệu tài chính trong {financial_data['period']}:
@@ -615,10 +915,7 @@ class FinancialChatbot:
         """
         
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=full_prompt
-            )
+            response = await self._generate(full_prompt)
             return response.text
         except Exception as e:
             return f"Xin lỗi, tôi gặp lỗi khi xử lý yêu cầu của bạn: {str(e)}"
@@ -652,7 +949,20 @@ class FinancialChatbot:
         
         return "\n".join(recommendations)
     
-    def chat_with_user(self, db: Session, user_id: int, message: str, days: int = 30) -> Dict[str, Any]:
+    def _financial_summary(self, db: Session, user_id: int, intent: Intent, days: int) -> Optional[Dict[str, Any]]:
+        """Tóm tắt tài chính, chỉ cho câu hỏi liên quan đến dữ liệu tài chính"""
+        if not intent.needs_data:
+            return None
+        
+        financial_data = self.get_user_financial_data(db, user_id, days)
+        return {
+            'total_income': financial_data['total_income'],
+            'total_expense': financial_data['total_expense'],
+            'net_balance': financial_data['net_balance'],
+            'period': financial_data['period']
+        }
+    
+    async def chat_with_user(self, db: Session, user_id: int, message: str, days: int = 30) -> Dict[str, Any]:
         """
         Xử lý tin nhắn từ người dùng và trả về phản hồi
         Sử dụng AI Agent để tự động quyết định có cần truy vấn database
@@ -660,30 +970,31 @@ class FinancialChatbot:
         """
         try:
             # Thêm tin nhắn user vào lịch sử
-            self._add_to_history(user_id, "user", message)
+            self.history.append(db, user_id, "user", message)
+            history = self.history.get(db, user_id)
+            intent = classify_intent(message)
             
             # Use agent-based approach with tool calling
-            response = self.generate_financial_advice_with_agent(message, db, user_id)
+            usage = AgentUsage()
+            response = await self.generate_financial_advice_with_agent(
+                message, db, user_id, usage, history, intent
+            )
+            logger.info("chat turn user=%s %s", user_id, usage.as_dict())
             
             # Thêm phản hồi của bot vào lịch sử
-            self._add_to_history(user_id, "bot", response)
+            self.history.append(db, user_id, "bot", response)
             
-            # Only get financial summary if question is finance-related
             result = {
                 'success': True,
                 'response': response,
-                'agent_mode': True
+                'agent_mode': True,
+                'usage': usage.as_dict()
             }
             
             # Only include financial summary for finance-related questions
-            if self._is_finance_related(message) and not self._is_general_question(message):
-                financial_data = self.get_user_financial_data(db, user_id, days)
-                result['financial_summary'] = {
-                    'total_income': financial_data['total_income'],
-                    'total_expense': financial_data['total_expense'],
-                    'net_balance': financial_data['net_balance'],
-                    'period': financial_data['period']
-                }
+            financial_summary = self._financial_summary(db, user_id, intent, days)
+            if financial_summary:
+                result['financial_summary'] = financial_summary
             
             return result
             
@@ -693,7 +1004,52 @@ class FinancialChatbot:
                 'error': f"Lỗi khi xử lý yêu cầu: {str(e)}",
                 'response': "Xin lỗi, tôi gặp lỗi khi xử lý yêu cầu của bạn. Vui lòng thử lại sau."
             }
+    
+    async def stream_chat_with_user(
+        self, db: Session, user_id: int, message: str, days: int = 30
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming version of chat_with_user
+        Yields ("delta", {"text": ...}) as text arrives, then one
+        ("done", {...}) event with the financial summary
+        """
+        self.history.append(db, user_id, "user", message)
+        history = self.history.get(db, user_id)
+        intent = classify_intent(message)
+        
+        usage = AgentUsage()
+        parts = []
+        async for text in self.stream_financial_advice_with_agent(
+            message, db, user_id, usage, history, intent
+        ):
+            parts.append(text)
+            yield "delta", {"text": text}
+        logger.info("chat stream user=%s %s", user_id, usage.as_dict())
+        
+        self.history.append(db, user_id, "bot", "".join(parts))
+        
+        done = {'success': True, 'usage': usage.as_dict()}
+        financial_summary = self._financial_summary(db, user_id, intent, days)
+        if financial_summary:
+            done['financial_summary'] = financial_summary
+        yield "done", done
+
+
+# Global chatbot instance, built on first use so that importing the API does
+# not construct (or require credentials for) the LLM client
+_chatbot: Optional[FinancialChatbot] = None
+_chatbot_lock = threading.Lock()
 
 
-# Global chatbot instance
-chatbot = FinancialChatbot()
+def get_chatbot() -> FinancialChatbot:
+    """
+    Return the shared chatbot, building it on first call
+    Raises ImportError or ValueError when the LLM backend is not configured;
+    a later call tries again
+    """
+    global _chatbot
+    if _chatbot is None:
+        with _chatbot_lock:
+            if _chatbot is None:
+                _chatbot = FinancialChatbot()
+    return _chatbot
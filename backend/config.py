@@ -23,6 +23,18 @@ class Settings(BaseSettings):
     jwt_secret_key: str = "your-jwt-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # bcrypt runs on a dedicated pool; requests beyond workers + queue get 503
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+    # Per-process cache of decoded tokens and active users
+    auth_cache_ttl_seconds: int = 60
+    auth_cache_max_size: int = 1024
+    # Per-user cache of analytics responses, keyed by data version: "memory"
+    # is per process and bounded to analytics_cache_max_users (LRU),
+    # "database" is shared by all workers
+    analytics_cache_backend: str = "memory"
+    analytics_cache_ttl_seconds: int = 3600
+    analytics_cache_max_users: int = 1024
 
     # Database
     database_url: str = "sqlite:///./data/moneyflow.db"
@@ -43,6 +55,27 @@ class Settings(BaseSettings):
     
     # AI Chatbot
     gemini_api_key: str = ""
+    # "gemini", or "fake" for offline testing and load tests
+    llm_backend: str = "gemini"
+    llm_model: str = "gemini-2.5-flash"
+    llm_timeout_seconds: float = 30.0
+    llm_max_concurrency: int = 8
+    llm_fake_latency_ms: int = 200
+    # Agent loop bounds per chat turn
+    chat_agent_max_steps: int = 3
+    chat_agent_token_budget: int = 20000
+    # Per-process cache of chatbot financial snapshots, keyed by data version
+    chat_snapshot_cache_ttl_seconds: int = 600
+    chat_snapshot_cache_max_size: int = 1024
+    # Per-process cache of chatbot answers, keyed by normalized question
+    chat_response_cache_ttl_seconds: int = 3600
+    chat_response_cache_max_size: int = 2048
+    # Conversation history: "database" is shared by all workers, "memory"
+    # is per process and bounded to chat_history_max_users (LRU)
+    chat_history_backend: str = "database"
+    chat_history_max_messages: int = 10
+    chat_history_idle_ttl_seconds: int = 86400
+    chat_history_max_users: int = 10000
 
     class Config:
         env_file = ".env"
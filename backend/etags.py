@@ -0,0 +1,67 @@
+"""
+Conditional GET support for per-user read endpoints
+The ETag of a response is derived from the user's data_version, so a client
+revalidating with If-None-Match gets 304 Not Modified after one auth check
+and one primary key lookup, before any listing or aggregation runs
+"""
+
+import hashlib
+from datetime import date
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from .database import get_db
+from .models import User
+from .rollups import get_data_version
+from .security import get_current_user
+
+# Per-user bodies must not be stored by shared caches, and clients must
+# revalidate before reusing them
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(request: Request, user_id: int, version: int) -> str:
+    """
+    Strong ETag for one URL of one user at one data version
+    The day is included, since endpoints default to the current month
+    """
+    digest = hashlib.blake2b(
+        f"{user_id}|{version}|{date.today()}|{request.url.path}?{request.url.query}".encode(),
+        digest_size=12,
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches, using weak comparison as
+    RFC 9110 requires for this header
+    """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def check_etag(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Dependency: answer 304 when the client's copy is current, otherwise
+    tag the response with its ETag
+    Shares the endpoint's user and session, as FastAPI caches dependencies
+    per request
+    """
+    etag = compute_etag(request, current_user.id, get_data_version(db, current_user.id))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
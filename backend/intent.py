@@ -0,0 +1,132 @@
+"""
+Intent classification for chatbot messages
+Keyword lists are compiled once into a prefix-trie regex, so a message is
+classified in one pass instead of one `in` scan per keyword and per check
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Pattern, Set
+
+from .text_utils import normalize_text
+
+GREETING_KEYWORDS = [
+    'chào', 'hello', 'hi', 'hey', 'xin chào',
+    'chào bạn', 'hế nhô', 'hế lô', 'alo'
+]
+FINANCE_KEYWORDS = [
+    'tiền', 'chi', 'thu', 'tiêu', 'tiết kiệm', 'đầu tư',
+    'thu nhập', 'chi tiêu', 'ngân sách', 'lương', 'tài chính',
+    'quản lý', 'phân tích', 'danh mục', 'giao dịch'
+]
+GENERAL_KEYWORDS = [
+    'làm sao', 'làm thế nào', 'cách nào', 'phương pháp',
+    'là gì', 'giải thích', 'định nghĩa',
+    'lời khuyên chung', 'nên làm gì', 'tôi nên'
+]
+DATA_KEYWORDS = [
+    'chi bao nhiêu', 'thu nhập của tôi', 'phân tích chi tiêu của tôi',
+    'top chi tiêu', 'danh mục của tôi', 'số liệu của tôi', 'dữ liệu của tôi',
+    'tháng này của tôi', 'tháng trước của tôi'
+]
+
+# Greetings are short; longer messages mentioning "chào" are real questions
+GREETING_MAX_WORDS = 3
+
+_KEYWORDS = {
+    'greeting': GREETING_KEYWORDS,
+    'finance': FINANCE_KEYWORDS,
+    'general': GENERAL_KEYWORDS,
+    'data': DATA_KEYWORDS,
+}
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Alternation of `words` factored by common prefix, e.g. "ch(?:i(?: tiêu)?|ào)"
+    Greedy optional suffixes make the longest keyword at a position win
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+def _compile(keywords: Dict[str, Iterable[str]]) -> "tuple[Pattern, Dict[str, Set[str]]]":
+    """
+    One regex over all keywords, plus the labels each keyword implies
+    A keyword carries the labels of every keyword it contains, and matches
+    are tried at every position (zero-width lookahead), so overlapping
+    keywords give the same labels as separate substring scans
+    """
+    labels: Dict[str, Set[str]] = {}
+    for label, words in keywords.items():
+        for word in words:
+            labels.setdefault(word, set())
+    for label, words in keywords.items():
+        for word in words:
+            for keyword in labels:
+                if word in keyword:
+                    labels[keyword].add(label)
+
+    return re.compile("(?=(" + _trie_pattern(labels) + "))"), labels
+
+
+_PATTERN, _LABELS = _compile(_KEYWORDS)
+
+# Messages typed without accents ("tiet kiem") are matched against the
+# multi-syllable keywords only; stripped single syllables are ambiguous
+# ("chi" would match "chị", "chỉ")
+_PLAIN_PATTERN, _PLAIN_LABELS = _compile({
+    label: {normalize_text(word) for word in words if ' ' in word}
+    for label, words in _KEYWORDS.items()
+})
+
+
+@dataclass(frozen=True)
+class Intent:
+    """What a chat message asks for, classified once per request"""
+    greeting: bool
+    finance: bool
+    general: bool
+    normalized: str
+
+    @property
+    def needs_data(self) -> bool:
+        """Finance question about the user's own data, answered with tools"""
+        return self.finance and not self.general
+
+
+def _labels(pattern: Pattern, labels: Dict[str, Set[str]], text: str) -> Set[str]:
+    found: Set[str] = set()
+    for match in pattern.finditer(text):
+        found |= labels[match.group(1)]
+    return found
+
+
+def classify_intent(message: str) -> Intent:
+    """Classify a chat message into greeting / finance / general flags"""
+    normalized = normalize_text(message)
+    found = _labels(_PATTERN, _LABELS, message.lower())
+    if message.isascii():
+        found |= _labels(_PLAIN_PATTERN, _PLAIN_LABELS, normalized)
+
+    finance = 'finance' in found
+    return Intent(
+        greeting='greeting' in found and len(message.split()) <= GREETING_MAX_WORDS,
+        finance=finance,
+        # Not about finance, or a general finance question without personal data
+        general=not finance or ('general' in found and 'data' not in found),
+        normalized=normalized,
+    )
@@ -0,0 +1,179 @@
+"""
+LLM backends for the chatbot
+GeminiBackend talks to Gemini through the async client; FakeLLMBackend
+answers locally so the chat pipeline can be tested and load-tested offline
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, List, Optional, Union
+
+from .config import settings
+
+
+class LLMBackend:
+    """
+    Interface: generate() returns an object with `.text` and `.candidates`;
+    stream() yields objects of the same shape as they are produced
+    """
+
+    name = "base"
+
+    async def generate(self, contents: Any, config: Optional[dict] = None) -> Any:
+        raise NotImplementedError
+
+    async def stream(
+        self, contents: Any, config: Optional[dict] = None
+    ) -> AsyncIterator[Any]:
+        """Backends without streaming yield the whole response as one chunk"""
+        yield await self.generate(contents, config)
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via `client.aio`, so calls never block the event loop"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str):
+        # Checked first so an unconfigured backend fails without the import cost
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is required in environment variables")
+
+        try:
+            import google.genai as genai
+        except ImportError:
+            raise ImportError(
+                "google-genai package is required. Install with: pip install google-genai"
+            )
+
+        self.model = model
+        self.client = genai.Client(api_key=api_key)
+
+    async def generate(self, contents: Any, config: Optional[dict] = None) -> Any:
+        return await self.client.aio.models.generate_content(
+            model=self.model, contents=contents, config=config
+        )
+
+    async def stream(
+        self, contents: Any, config: Optional[dict] = None
+    ) -> AsyncIterator[Any]:
+        response = await self.client.aio.models.generate_content_stream(
+            model=self.model, contents=contents, config=config
+        )
+        async for chunk in response:
+            yield chunk
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Offline backend with a fixed latency
+    With `tool_call` set (one tool name or a list), requests that offer tools
+    get function calls back, as Gemini would, for the first `tool_rounds`
+    steps, unless function calling mode is "NONE". Streams yield the reply word by word, spreading the latency
+    across the chunks. Token usage is estimated at four characters a token
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        reply: str = "Đây là câu trả lời thử nghiệm 😊",
+        tool_call: Optional[Union[str, List[str]]] = None,
+        tool_args: Optional[dict] = None,
+        tool_rounds: int = 1,
+    ):
+        self.latency = latency
+        self.reply = reply
+        self.tool_call = tool_call
+        self.tool_args = tool_args or {}
+        self.tool_rounds = tool_rounds
+        self.calls = 0
+        self.requests = []
+        self.configs = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, contents: Any, config: Optional[dict] = None) -> Any:
+        self.calls += 1
+        self.requests.append(contents)
+        self.configs.append(config)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        if self._wants_tool(contents, config):
+            return self._tool_response(contents)
+        return _text_response(self.reply, contents)
+
+    async def stream(
+        self, contents: Any, config: Optional[dict] = None
+    ) -> AsyncIterator[Any]:
+        self.calls += 1
+        self.requests.append(contents)
+        self.configs.append(config)
+        if self._wants_tool(contents, config):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            yield self._tool_response(contents)
+            return
+
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            if self.latency:
+                await asyncio.sleep(self.latency / len(words))
+            yield _text_response(word if i == 0 else " " + word, contents)
+
+    def _wants_tool(self, contents: Any, config: Optional[dict]) -> bool:
+        if not (self.tool_call and config and config.get("tools")):
+            return False
+        mode = (config.get("tool_config") or {}).get("function_calling_config", {}).get("mode")
+        if mode == "NONE":
+            return False
+        # Each tool round adds a model turn and a user turn to the contents
+        rounds = (len(contents) - 1) // 2 if isinstance(contents, list) else 0
+        return rounds < self.tool_rounds
+
+    def _tool_response(self, contents: Any) -> Any:
+        names = [self.tool_call] if isinstance(self.tool_call, str) else self.tool_call
+        parts = [
+            SimpleNamespace(
+                function_call=SimpleNamespace(name=name, args=dict(self.tool_args)),
+                text=None,
+            )
+            for name in names
+        ]
+        return SimpleNamespace(
+            text=None,
+            candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))],
+            usage_metadata=_usage(contents, ""),
+        )
+
+
+def _usage(contents: Any, text: str) -> Any:
+    return SimpleNamespace(
+        prompt_token_count=len(str(contents)) // 4,
+        candidates_token_count=len(text) // 4,
+    )
+
+
+def _text_response(text: str, contents: Any = "") -> Any:
+    part = SimpleNamespace(function_call=None, text=text)
+    return SimpleNamespace(
+        text=text,
+        candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+        usage_metadata=_usage(contents, text),
+    )
+
+
+def create_llm_backend() -> LLMBackend:
+    """Build the backend selected by LLM_BACKEND"""
+    if settings.llm_backend == "fake":
+        return FakeLLMBackend(latency=settings.llm_fake_latency_ms / 1000)
+    if settings.llm_backend == "gemini":
+        return GeminiBackend(settings.gemini_api_key, settings.llm_model)
+    raise ValueError(f"Unknown LLM_BACKEND: {settings.llm_backend}")
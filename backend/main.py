@@ -8,9 +8,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
+from . import rollups  # noqa: F401 - registers the rollup and user stats write hooks
 from .config import settings
 from .database import get_db, init_db
-from .routers import admin, analytics, auth, categories, transactions, users, chatbot
+from .routers import admin, analytics, auth, categories, pages, transactions, users, chatbot
+from .chatbot_service import chat_response_cache, financial_snapshot_cache
+from .response_cache import analytics_cache
+from .security import password_pool_stats, token_cache, user_cache
 
 # Create FastAPI application
 app = FastAPI(
@@ -28,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include routers
@@ -38,6 +43,7 @@ app.include_router(analytics.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(admin.router, prefix="/api")
 app.include_router(chatbot.router, prefix="/api")
+app.include_router(pages.router, prefix="/api")
 
 
 @app.on_event("startup")
@@ -88,6 +94,17 @@ async def startup_event():
             db.add(category)
 
     db.commit()
+
+    # Backfill rollups and user stats for databases created before they existed
+    from .models import MonthlyRollup, Transaction, UserStats
+    from .rollups import rebuild_rollups, rebuild_user_stats
+
+    if db.query(Transaction).first():
+        if db.query(MonthlyRollup).first() is None:
+            rebuild_rollups(db)
+        if db.query(UserStats).first() is None:
+            rebuild_user_stats(db)
+
     db.close()
 
 
@@ -111,6 +128,21 @@ async def health_check():
     return {"status": "healthy", "environment": settings.environment}
 
 
+@app.get("/api/metrics")
+async def metrics():
+    """
+    Runtime metrics for worker pools and caches
+    """
+    return {
+        "password_pool": password_pool_stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "financial_snapshot_cache": financial_snapshot_cache.stats(),
+        "chat_response_cache": chat_response_cache.stats(),
+        "analytics_cache": analytics_cache.stats(),
+    }
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -2,8 +2,10 @@
 Database models for MoneyFlow application
 """
 
+from datetime import datetime
+
 from sqlalchemy import (Boolean, Column, Date, DateTime, Float, ForeignKey,
-                        Integer, String)
+                        Index, Integer, String, Text)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -31,6 +33,15 @@ class User(Base):
     categories = relationship(
         "Category", back_populates="user", cascade="all, delete-orphan"
     )
+    monthly_rollups = relationship(
+        "MonthlyRollup", back_populates="user", cascade="all, delete-orphan"
+    )
+    stats = relationship(
+        "UserStats", back_populates="user", uselist=False, cascade="all, delete-orphan"
+    )
+    chat_messages = relationship(
+        "ChatMessage", back_populates="user", cascade="all, delete-orphan"
+    )
 
 
 class Category(Base):
@@ -72,3 +83,108 @@ class Transaction(Base):
     # Relationships
     user = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
+
+    # Indexes matching the router access paths; the partial ones only cover
+    # live rows, which is what every analytics and listing query reads
+    __table_args__ = (
+        Index("ix_transactions_user_deleted_date", user_id, is_deleted, date),
+        Index(
+            "ix_transactions_user_type_date",
+            user_id,
+            type,
+            date,
+            sqlite_where=is_deleted == False,
+            postgresql_where=is_deleted == False,
+        ),
+        Index(
+            "ix_transactions_user_category_date",
+            user_id,
+            category_id,
+            date,
+            sqlite_where=is_deleted == False,
+            postgresql_where=is_deleted == False,
+        ),
+        Index("ix_transactions_category_id", category_id),
+    )
+
+
+class MonthlyRollup(Base):
+    """
+    Per-user monthly totals by category and type - REQ-F-013 to REQ-F-015
+    Maintained on write by backend.rollups, never edited directly
+    """
+
+    __tablename__ = "monthly_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    type = Column(String, primary_key=True)  # 'income' or 'expense'
+    total_amount = Column(Float, nullable=False, default=0.0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    # Relationships
+    user = relationship("User", back_populates="monthly_rollups")
+    category = relationship("Category")
+
+
+class UserStats(Base):
+    """
+    Lifetime transaction statistics per user for admin views
+    Maintained on write by backend.rollups, never edited directly
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_income = Column(Float, nullable=False, default=0.0)
+    total_expense = Column(Float, nullable=False, default=0.0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    # Bumped on every write to the user's transactions; keys derived caches
+    data_version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Relationships
+    user = relationship("User", back_populates="stats")
+
+
+class ChatMessage(Base):
+    """
+    Chatbot conversation history, one row per message
+    Append-only; maintained by backend.chat_history
+    """
+
+    __tablename__ = "chat_messages"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    role = Column(String, nullable=False)  # 'user' or 'bot'
+    message = Column(String, nullable=False)
+    # Naive UTC, compared against the idle window in Python
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Relationships
+    user = relationship("User", back_populates="chat_messages")
+
+    __table_args__ = (
+        Index("ix_chat_messages_user_id_id", user_id, id),
+        Index("ix_chat_messages_created_at", created_at),
+    )
+
+
+class CachedResponse(Base):
+    """
+    Shared cache of analytics responses, one row per (user, key)
+    Maintained by backend.response_cache; rows can be deleted at any time
+    """
+
+    __tablename__ = "response_cache"
+
+    user_id = Column(Integer, primary_key=True)
+    cache_key = Column(String, primary_key=True)
+    data_version = Column(Integer, nullable=False)
+    value = Column(Text, nullable=False)  # JSON
+    # Naive UTC, compared against the TTL in Python
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_response_cache_created_at", created_at),)
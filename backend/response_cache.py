@@ -0,0 +1,239 @@
+"""
+Per-user cache of analytics responses
+Entries are keyed by (user, endpoint, params, day) and tagged with the user's
+data_version. Every write to the user's transactions or categories bumps the
+version, so a cached response is never served after the data changed.
+MemoryResponseCache is a per-process LRU over users; DatabaseResponseCache
+keeps entries in the response_cache table so every worker shares them
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache
+from .config import settings
+from .models import CachedResponse
+from .rollups import get_data_version
+
+logger = logging.getLogger(__name__)
+
+# Distinct date ranges a user may page through before the oldest is dropped
+MAX_RESPONSES_PER_USER = 64
+
+
+class ResponseCache:
+    """
+    Interface: JSON-compatible responses per (user, key), valid only for the
+    data version they were computed at and for at most `ttl` seconds
+    """
+
+    name = "base"
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int, version: int, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, db: Session, user_id: int, version: int, key: str, value: Any):
+        raise NotImplementedError
+
+    def invalidate_user(self, db: Session, user_id: int):
+        """Drop every entry of a user whose id may be reused, e.g. on delete"""
+        raise NotImplementedError
+
+    def clear(self):
+        with self._counter_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _count(self, hit: bool):
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._counter_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    Per-process cache, at most `max_users` users before LRU eviction
+    Each user's entry holds the responses of one data version; a newer
+    version replaces the whole entry
+    """
+
+    name = "memory"
+
+    def __init__(self, ttl: float, max_users: int):
+        super().__init__(ttl)
+        self._cache = TTLCache(max_users, ttl)
+
+    def get(self, db: Session, user_id: int, version: int, key: str) -> Optional[Any]:
+        entry = self._cache.get(user_id)
+        value = None
+        if entry is not None and entry["version"] == version:
+            value = entry["responses"].get(key)
+        self._count(value is not None)
+        return value
+
+    def set(self, db: Session, user_id: int, version: int, key: str, value: Any):
+        entry = self._cache.get(user_id)
+        if entry is None or entry["version"] != version:
+            entry = {"version": version, "responses": OrderedDict()}
+            self._cache.set(user_id, entry)
+
+        responses = entry["responses"]
+        responses[key] = value
+        if len(responses) > MAX_RESPONSES_PER_USER:
+            responses.popitem(last=False)
+
+    def invalidate_user(self, db: Session, user_id: int):
+        self._cache.delete(user_id)
+
+    def clear(self):
+        super().clear()
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "users": self._cache.stats()["size"]}
+
+
+class DatabaseResponseCache(ResponseCache):
+    """
+    Cache in the response_cache table
+    Storing a response drops the user's rows of older versions; rows past
+    the TTL are pruned at most once per `prune_interval`
+    """
+
+    name = "database"
+
+    def __init__(self, ttl: float, prune_interval: float = 3600):
+        super().__init__(ttl)
+        self.prune_interval = prune_interval
+        # The first write of each process prunes
+        self._last_prune = float("-inf")
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.ttl)
+
+    def get(self, db: Session, user_id: int, version: int, key: str) -> Optional[Any]:
+        value = (
+            db.query(CachedResponse.value)
+            .filter(
+                CachedResponse.user_id == user_id,
+                CachedResponse.cache_key == key,
+                CachedResponse.data_version == version,
+                CachedResponse.created_at >= self._cutoff(),
+            )
+            .scalar()
+        )
+        self._count(value is not None)
+        return None if value is None else json.loads(value)
+
+    def set(self, db: Session, user_id: int, version: int, key: str, value: Any):
+        connection = db.connection()
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        row = {
+            "user_id": user_id,
+            "cache_key": key,
+            "data_version": version,
+            "value": json.dumps(value, ensure_ascii=False),
+            "created_at": datetime.utcnow(),
+        }
+        stmt = dialect.insert(CachedResponse).values(row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "cache_key"],
+            set_={k: stmt.excluded[k] for k in ("data_version", "value", "created_at")},
+        )
+
+        # A failed cache write must not fail the request that computed it
+        try:
+            db.query(CachedResponse).filter(
+                CachedResponse.user_id == user_id,
+                CachedResponse.data_version != version,
+            ).delete(synchronize_session=False)
+            connection.execute(stmt)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning("Could not cache response for user %s: %s", user_id, e)
+            return
+
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self.prune(db)
+
+    def invalidate_user(self, db: Session, user_id: int):
+        db.query(CachedResponse).filter(CachedResponse.user_id == user_id).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+    def prune(self, db: Session) -> int:
+        """Delete rows older than the TTL, returning the row count"""
+        self._last_prune = time.monotonic()
+        deleted = (
+            db.query(CachedResponse)
+            .filter(CachedResponse.created_at < self._cutoff())
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the cache selected by ANALYTICS_CACHE_BACKEND"""
+    if settings.analytics_cache_backend == "memory":
+        return MemoryResponseCache(
+            settings.analytics_cache_ttl_seconds, settings.analytics_cache_max_users
+        )
+    if settings.analytics_cache_backend == "database":
+        return DatabaseResponseCache(settings.analytics_cache_ttl_seconds)
+    raise ValueError(
+        f"Unknown ANALYTICS_CACHE_BACKEND: {settings.analytics_cache_backend}"
+    )
+
+
+analytics_cache = create_response_cache()
+
+
+def cached_response(
+    db: Session, user_id: int, endpoint: str, params: dict, build: Callable[[], Any]
+) -> Any:
+    """
+    Return the cached response of `endpoint` for these params, or build,
+    cache and return it
+    The day is part of the key, since endpoints default to the current month
+    """
+    version = get_data_version(db, user_id)
+    key = json.dumps(
+        [endpoint, jsonable_encoder(params), date.today().isoformat()], sort_keys=True
+    )
+
+    value = analytics_cache.get(db, user_id, version, key)
+    if value is None:
+        value = jsonable_encoder(build())
+        analytics_cache.set(db, user_id, version, key, value)
+    return value
@@ -0,0 +1,445 @@
+"""
+Monthly rollup and user stats maintenance
+Keeps monthly_rollups and user_stats in sync with transactions inside the
+same DB transaction
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, event, extract, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import MonthlyRollup, Transaction, User, UserStats
+
+# (user_id, year, month, category_id, type)
+RollupKey = Tuple[int, int, int, int, str]
+# key -> [amount delta, count delta]
+RollupDeltas = Dict[RollupKey, List[float]]
+
+_PENDING_DELTAS = "monthly_rollup_deltas"
+_TRACKED_FIELDS = ("user_id", "date", "type", "category_id", "amount", "is_deleted")
+_DRIFT_TOLERANCE = 0.005
+
+
+def _add_delta(deltas: RollupDeltas, snapshot: dict, sign: int):
+    """Add one transaction state to the deltas (soft-deleted rows count as absent)"""
+    if snapshot["is_deleted"]:
+        return
+
+    txn_date = snapshot["date"]
+    key = (
+        snapshot["user_id"],
+        txn_date.year,
+        txn_date.month,
+        snapshot["category_id"],
+        snapshot["type"],
+    )
+    delta = deltas.setdefault(key, [0.0, 0])
+    delta[0] += sign * snapshot["amount"]
+    delta[1] += sign
+
+
+def _current_snapshot(transaction: Transaction) -> dict:
+    """Snapshot of a transaction as it will be written"""
+    return {
+        "user_id": transaction.user_id,
+        "date": transaction.date,
+        "type": transaction.type,
+        "category_id": transaction.category_id,
+        "amount": transaction.amount,
+        "is_deleted": bool(transaction.is_deleted),
+    }
+
+
+def _committed_snapshot(session: Session, transaction: Transaction) -> dict:
+    """
+    Snapshot of a transaction as it is stored in the database
+    Uses attribute history, falling back to the row itself when an expired
+    attribute was overwritten without being loaded first
+    """
+    state = inspect(transaction)
+    snapshot = {}
+    for field in _TRACKED_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            snapshot[field] = history.deleted[0]
+        elif history.unchanged:
+            snapshot[field] = history.unchanged[0]
+        else:
+            break
+    else:
+        snapshot["is_deleted"] = bool(snapshot["is_deleted"])
+        return snapshot
+
+    columns = [getattr(Transaction, field) for field in _TRACKED_FIELDS]
+    row = session.connection().execute(
+        select(*columns).where(Transaction.id == state.identity[0])
+    ).one()
+    snapshot = dict(zip(_TRACKED_FIELDS, row))
+    snapshot["is_deleted"] = bool(snapshot["is_deleted"])
+    return snapshot
+
+
+def _deleted_user_ids(session: Session) -> set:
+    return {obj.id for obj in session.deleted if isinstance(obj, User)}
+
+
+def _user_stats_rows(deltas: RollupDeltas) -> List[dict]:
+    """
+    Collapse rollup deltas into one user_stats delta per user
+    Every user with a touched transaction gets a row, even when the totals
+    net to zero, so its data_version is still bumped
+    """
+    per_user: Dict[int, dict] = {}
+    for (user_id, _, _, _, txn_type), (amount, count) in deltas.items():
+        row = per_user.setdefault(
+            user_id,
+            {
+                "user_id": user_id,
+                "total_income": 0.0,
+                "total_expense": 0.0,
+                "transaction_count": 0,
+                "data_version": 1,
+            },
+        )
+        row["total_income" if txn_type == "income" else "total_expense"] += amount
+        row["transaction_count"] += count
+
+    return list(per_user.values())
+
+
+def _apply_user_stats_deltas(connection, dialect, deltas: RollupDeltas):
+    rows = _user_stats_rows(deltas)
+    if not rows:
+        return
+
+    stmt = dialect.insert(UserStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "total_income": UserStats.total_income + stmt.excluded.total_income,
+            "total_expense": UserStats.total_expense + stmt.excluded.total_expense,
+            "transaction_count": UserStats.transaction_count
+            + stmt.excluded.transaction_count,
+            "data_version": UserStats.data_version + 1,
+        },
+    )
+    connection.execute(stmt, rows)
+
+
+def get_data_version(db: Session, user_id: int) -> int:
+    """
+    Current data version of a user's transactions, 0 before the first write
+    """
+    version = db.query(UserStats.data_version).filter(UserStats.user_id == user_id).scalar()
+    return version or 0
+
+
+def bump_data_version(session: Session, *user_ids: int):
+    """
+    Bump the data version of users for writes that change derived views
+    without going through the transaction hooks, e.g. renaming a category
+    """
+    if not user_ids:
+        return
+
+    connection = session.connection()
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(UserStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"data_version": UserStats.data_version + 1},
+    )
+    connection.execute(
+        stmt, [{"user_id": user_id, "data_version": 1} for user_id in user_ids]
+    )
+
+
+def apply_rollup_deltas(session: Session, deltas: RollupDeltas):
+    """
+    Upsert rollup and user stats deltas with `total = total + delta` so
+    concurrent writers never lose updates
+    """
+    if not deltas:
+        return
+
+    connection = session.connection()
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    _apply_user_stats_deltas(connection, dialect, deltas)
+
+    rows = [
+        {
+            "user_id": key[0],
+            "year": key[1],
+            "month": key[2],
+            "category_id": key[3],
+            "type": key[4],
+            "total_amount": amount,
+            "transaction_count": count,
+        }
+        for key, (amount, count) in deltas.items()
+        if amount or count
+    ]
+    if not rows:
+        return
+
+    stmt = dialect.insert(MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "year", "month", "category_id", "type"],
+        set_={
+            "total_amount": MonthlyRollup.total_amount + stmt.excluded.total_amount,
+            "transaction_count": MonthlyRollup.transaction_count
+            + stmt.excluded.transaction_count,
+        },
+    )
+    connection.execute(stmt, rows)
+
+
+def apply_inserted_rows(session: Session, rows: List[dict]):
+    """
+    Add rows written with a bulk INSERT, which bypasses the flush hooks
+    """
+    deltas: RollupDeltas = {}
+    for row in rows:
+        _add_delta(deltas, {**row, "is_deleted": row.get("is_deleted", False)}, 1)
+    apply_rollup_deltas(session, deltas)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_previous_states(session, flush_context, instances):
+    """Subtract the stored state of every transaction about to change"""
+    deltas = session.info.setdefault(_PENDING_DELTAS, {})
+    deleted_users = _deleted_user_ids(session)
+
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj):
+            _add_delta(deltas, _committed_snapshot(session, obj), -1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction) and obj.user_id not in deleted_users:
+            _add_delta(deltas, _committed_snapshot(session, obj), -1)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_new_states(session, flush_context):
+    """Add the written state of every new or changed transaction and upsert"""
+    deltas = session.info.pop(_PENDING_DELTAS, {})
+    deleted_users = _deleted_user_ids(session)
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            _add_delta(deltas, _current_snapshot(obj), 1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj):
+            _add_delta(deltas, _current_snapshot(obj), 1)
+
+    # Rollups and stats of a deleted user are removed by cascade
+    deltas = {key: delta for key, delta in deltas.items() if key[0] not in deleted_users}
+    apply_rollup_deltas(session, deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_deltas(session):
+    session.info.pop(_PENDING_DELTAS, None)
+
+
+def compute_rollups(db: Session, user_id: Optional[int] = None) -> RollupDeltas:
+    """Recompute rollups from raw transactions"""
+    year = extract("year", Transaction.date)
+    month = extract("month", Transaction.date)
+    query = db.query(
+        Transaction.user_id,
+        year.label("year"),
+        month.label("month"),
+        Transaction.category_id,
+        Transaction.type,
+        func.sum(Transaction.amount).label("total"),
+        func.count(Transaction.id).label("count"),
+    ).filter(Transaction.is_deleted == False)
+
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+
+    results = query.group_by(
+        Transaction.user_id, year, month, Transaction.category_id, Transaction.type
+    ).all()
+
+    return {
+        (r.user_id, int(r.year), int(r.month), r.category_id, r.type): [r.total, r.count]
+        for r in results
+    }
+
+
+def find_rollup_drift(db: Session, user_id: Optional[int] = None) -> List[dict]:
+    """
+    Compare stored rollups with raw transactions
+    Returns one entry per key whose sum or count differs
+    """
+    expected = compute_rollups(db, user_id)
+
+    query = db.query(MonthlyRollup)
+    if user_id is not None:
+        query = query.filter(MonthlyRollup.user_id == user_id)
+    stored = {
+        (r.user_id, r.year, r.month, r.category_id, r.type): [
+            r.total_amount,
+            r.transaction_count,
+        ]
+        for r in query.all()
+    }
+
+    drift = []
+    for key in sorted(set(expected) | set(stored), key=str):
+        expected_amount, expected_count = expected.get(key, [0.0, 0])
+        stored_amount, stored_count = stored.get(key, [0.0, 0])
+        if (
+            expected_count != stored_count
+            or abs(expected_amount - stored_amount) > _DRIFT_TOLERANCE
+        ):
+            drift.append(
+                {
+                    "user_id": key[0],
+                    "year": key[1],
+                    "month": key[2],
+                    "category_id": key[3],
+                    "type": key[4],
+                    "expected_amount": expected_amount,
+                    "stored_amount": stored_amount,
+                    "expected_count": expected_count,
+                    "stored_count": stored_count,
+                }
+            )
+
+    return drift
+
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Replace stored rollups with values recomputed from raw transactions
+    Returns the number of rollup rows written
+    """
+    expected = compute_rollups(db, user_id)
+
+    query = db.query(MonthlyRollup)
+    if user_id is not None:
+        query = query.filter(MonthlyRollup.user_id == user_id)
+    # Analytics cached against the old rollups must not be served again
+    rebuilt_users = {key[0] for key in expected}
+    rebuilt_users.update(
+        user_id for (user_id,) in query.with_entities(MonthlyRollup.user_id).distinct()
+    )
+    query.delete(synchronize_session=False)
+
+    db.add_all(
+        MonthlyRollup(
+            user_id=key[0],
+            year=key[1],
+            month=key[2],
+            category_id=key[3],
+            type=key[4],
+            total_amount=amount,
+            transaction_count=count,
+        )
+        for key, (amount, count) in expected.items()
+    )
+    bump_data_version(db, *sorted(rebuilt_users))
+    db.commit()
+
+    return len(expected)
+
+
+def compute_user_stats(db: Session, user_id: Optional[int] = None) -> Dict[int, list]:
+    """Recompute lifetime [income, expense, count] per user from raw transactions"""
+    query = db.query(
+        Transaction.user_id,
+        func.sum(case((Transaction.type == "income", Transaction.amount), else_=0.0)).label(
+            "income"
+        ),
+        func.sum(case((Transaction.type == "expense", Transaction.amount), else_=0.0)).label(
+            "expense"
+        ),
+        func.count(Transaction.id).label("count"),
+    ).filter(Transaction.is_deleted == False)
+
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+
+    return {
+        r.user_id: [r.income or 0.0, r.expense or 0.0, r.count]
+        for r in query.group_by(Transaction.user_id).all()
+    }
+
+
+def find_user_stats_drift(db: Session, user_id: Optional[int] = None) -> List[dict]:
+    """
+    Compare stored user stats with raw transactions
+    Returns one entry per user whose totals or count differ
+    """
+    expected = compute_user_stats(db, user_id)
+
+    query = db.query(UserStats)
+    if user_id is not None:
+        query = query.filter(UserStats.user_id == user_id)
+    stored = {
+        s.user_id: [s.total_income, s.total_expense, s.transaction_count]
+        for s in query.all()
+    }
+
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        expected_income, expected_expense, expected_count = expected.get(key, [0.0, 0.0, 0])
+        stored_income, stored_expense, stored_count = stored.get(key, [0.0, 0.0, 0])
+        if (
+            expected_count != stored_count
+            or abs(expected_income - stored_income) > _DRIFT_TOLERANCE
+            or abs(expected_expense - stored_expense) > _DRIFT_TOLERANCE
+        ):
+            drift.append(
+                {
+                    "user_id": key,
+                    "expected_income": expected_income,
+                    "stored_income": stored_income,
+                    "expected_expense": expected_expense,
+                    "stored_expense": stored_expense,
+                    "expected_count": expected_count,
+                    "stored_count": stored_count,
+                }
+            )
+
+    return drift
+
+
+def rebuild_user_stats(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Replace stored user stats with values recomputed from raw transactions
+    Returns the number of user_stats rows written
+    """
+    expected = compute_user_stats(db, user_id)
+
+    query = db.query(UserStats)
+    if user_id is not None:
+        query = query.filter(UserStats.user_id == user_id)
+    # Versions keep increasing, and rows of users without transactions are
+    # kept at zero, so caches keyed on a version never see an old value
+    version_query = db.query(UserStats.user_id, UserStats.data_version)
+    if user_id is not None:
+        version_query = version_query.filter(UserStats.user_id == user_id)
+    versions = dict(version_query.all())
+    query.delete(synchronize_session=False)
+
+    user_ids = set(expected) | set(versions)
+    db.add_all(
+        UserStats(
+            user_id=key,
+            total_income=expected.get(key, [0.0, 0.0, 0])[0],
+            total_expense=expected.get(key, [0.0, 0.0, 0])[1],
+            transaction_count=expected.get(key, [0.0, 0.0, 0])[2],
+            data_version=versions.get(key, 0) + 1,
+        )
+        for key in user_ids
+    )
+    db.commit()
+
+    return len(user_ids)
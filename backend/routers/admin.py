@@ -5,20 +5,37 @@ Admin router for user management
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import case, func, or_
 
+from ..chatbot_service import invalidate_financial_snapshots
 from ..database import get_db
-from ..models import User, Transaction
+from ..models import User, UserStats
+from ..response_cache import analytics_cache
+from ..rollups import (find_rollup_drift, find_user_stats_drift,
+                       rebuild_rollups, rebuild_user_stats)
 from ..schemas import (
     UserAdminResponse,
     UserAdminUpdate,
     MessageResponse,
+    SortOrder,
+    UserSortField,
 )
-from ..security import get_current_admin_user, get_password_hash
+from ..security import (get_current_admin_user, get_password_hash,
+                        invalidate_cached_user)
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
+def get_user_stats(db: Session, user_id: int):
+    """
+    Lifetime (income, expense, count) of a single user from user_stats
+    """
+    stats = db.get(UserStats, user_id)
+    if stats is None:
+        return (0.0, 0.0, 0)
+    return (stats.total_income, stats.total_expense, stats.transaction_count)
+
+
 @router.get("/users", response_model=List[UserAdminResponse])
 async def get_all_users(
     skip: int = Query(0, ge=0),
@@ -26,13 +43,30 @@ async def get_all_users(
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
     is_admin: Optional[bool] = None,
+    min_transactions: Optional[int] = Query(None, ge=0),
+    min_total_income: Optional[float] = Query(None, ge=0),
+    min_total_expense: Optional[float] = Query(None, ge=0),
+    sort_by: UserSortField = Query(UserSortField.ID),
+    order: SortOrder = Query(SortOrder.ASC),
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
 ):
     """
     Get all users with statistics (admin only)
+    Statistics come from the user_stats table joined to the users, so they
+    can be filtered and sorted on, e.g. sort_by=total_expense&order=desc
+    for top spenders
     """
-    query = db.query(User)
+    total_income = func.coalesce(UserStats.total_income, 0.0)
+    total_expense = func.coalesce(UserStats.total_expense, 0.0)
+    transaction_count = func.coalesce(UserStats.transaction_count, 0)
+
+    query = db.query(
+        User,
+        total_income.label("total_income"),
+        total_expense.label("total_expense"),
+        transaction_count.label("transaction_count"),
+    ).outerjoin(UserStats, UserStats.user_id == User.id)
 
     # Apply filters
     if search:
@@ -49,35 +83,35 @@ async def get_all_users(
     if is_admin is not None:
         query = query.filter(User.is_admin == is_admin)
 
-    # Get users with pagination
-    users = query.offset(skip).limit(limit).all()
-
-    # Build response with statistics
-    result = []
-    for user in users:
-        # Get transaction statistics
-        income_total = (
-            db.query(func.sum(Transaction.amount))
-            .filter(Transaction.user_id == user.id, Transaction.type == "income")
-            .scalar()
-            or 0
-        )
+    if min_transactions is not None:
+        query = query.filter(transaction_count >= min_transactions)
 
-        expense_total = (
-            db.query(func.sum(Transaction.amount))
-            .filter(Transaction.user_id == user.id, Transaction.type == "expense")
-            .scalar()
-            or 0
-        )
+    if min_total_income is not None:
+        query = query.filter(total_income >= min_total_income)
 
-        transaction_count = (
-            db.query(func.count(Transaction.id))
-            .filter(Transaction.user_id == user.id)
-            .scalar()
-            or 0
-        )
+    if min_total_expense is not None:
+        query = query.filter(total_expense >= min_total_expense)
 
-        user_data = UserAdminResponse(
+    sort_columns = {
+        UserSortField.ID: User.id,
+        UserSortField.CREATED_AT: User.created_at,
+        UserSortField.FULL_NAME: User.full_name,
+        UserSortField.EMAIL: User.email,
+        UserSortField.TRANSACTION_COUNT: transaction_count,
+        UserSortField.TOTAL_INCOME: total_income,
+        UserSortField.TOTAL_EXPENSE: total_expense,
+    }
+    sort_column = sort_columns[sort_by]
+    if order == SortOrder.DESC:
+        query = query.order_by(sort_column.desc(), User.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), User.id.asc())
+
+    # Get users with pagination
+    rows = query.offset(skip).limit(limit).all()
+
+    return [
+        UserAdminResponse(
             id=user.id,
             email=user.email,
             full_name=user.full_name,
@@ -85,13 +119,12 @@ async def get_all_users(
             updated_at=user.updated_at,
             is_active=user.is_active,
             is_admin=user.is_admin,
-            transaction_count=transaction_count,
-            total_income=float(income_total),
-            total_expense=float(expense_total),
+            transaction_count=count,
+            total_income=float(income),
+            total_expense=float(expense),
         )
-        result.append(user_data)
-
-    return result
+        for user, income, expense, count in rows
+    ]
 
 
 @router.get("/users/{user_id}", response_model=UserAdminResponse)
@@ -111,26 +144,7 @@ async def get_user_by_id(
         )
 
     # Get transaction statistics
-    income_total = (
-        db.query(func.sum(Transaction.amount))
-        .filter(Transaction.user_id == user.id, Transaction.type == "income")
-        .scalar()
-        or 0
-    )
-
-    expense_total = (
-        db.query(func.sum(Transaction.amount))
-        .filter(Transaction.user_id == user.id, Transaction.type == "expense")
-        .scalar()
-        or 0
-    )
-
-    transaction_count = (
-        db.query(func.count(Transaction.id))
-        .filter(Transaction.user_id == user.id)
-        .scalar()
-        or 0
-    )
+    income_total, expense_total, transaction_count = get_user_stats(db, user.id)
 
     return UserAdminResponse(
         id=user.id,
@@ -197,29 +211,11 @@ async def update_user(
         user.is_admin = user_data.is_admin
 
     db.commit()
+    invalidate_cached_user(user.id)
     db.refresh(user)
 
     # Get statistics
-    income_total = (
-        db.query(func.sum(Transaction.amount))
-        .filter(Transaction.user_id == user.id, Transaction.type == "income")
-        .scalar()
-        or 0
-    )
-
-    expense_total = (
-        db.query(func.sum(Transaction.amount))
-        .filter(Transaction.user_id == user.id, Transaction.type == "expense")
-        .scalar()
-        or 0
-    )
-
-    transaction_count = (
-        db.query(func.count(Transaction.id))
-        .filter(Transaction.user_id == user.id)
-        .scalar()
-        or 0
-    )
+    income_total, expense_total, transaction_count = get_user_stats(db, user.id)
 
     return UserAdminResponse(
         id=user.id,
@@ -260,6 +256,9 @@ async def delete_user(
 
     db.delete(user)
     db.commit()
+    invalidate_cached_user(user_id)
+    invalidate_financial_snapshots(user_id)
+    analytics_cache.invalidate_user(db, user_id)
 
     return MessageResponse(message="User deleted successfully", success=True)
 
@@ -271,22 +270,62 @@ async def get_admin_stats(
 ):
     """
     Get overall system statistics (admin only)
+    Totals are summed from user_stats, one row per user, instead of
+    scanning every transaction
     """
-    total_users = db.query(func.count(User.id)).scalar() or 0
-    active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0
-    admin_users = db.query(func.count(User.id)).filter(User.is_admin == True).scalar() or 0
-    total_transactions = db.query(func.count(Transaction.id)).scalar() or 0
-    total_income = db.query(func.sum(Transaction.amount)).filter(Transaction.type == "income").scalar() or 0
-    total_expense = db.query(func.sum(Transaction.amount)).filter(Transaction.type == "expense").scalar() or 0
+    users = db.query(
+        func.count(User.id).label("total"),
+        func.sum(case((User.is_active == True, 1), else_=0)).label("active"),
+        func.sum(case((User.is_admin == True, 1), else_=0)).label("admins"),
+    ).one()
+    totals = db.query(
+        func.sum(UserStats.transaction_count).label("count"),
+        func.sum(UserStats.total_income).label("income"),
+        func.sum(UserStats.total_expense).label("expense"),
+    ).one()
+
+    total_users = users.total or 0
+    active_users = users.active or 0
+    total_income = totals.income or 0
+    total_expense = totals.expense or 0
 
     return {
         "total_users": total_users,
         "active_users": active_users,
         "inactive_users": total_users - active_users,
-        "admin_users": admin_users,
-        "total_transactions": total_transactions,
+        "admin_users": users.admins or 0,
+        "total_transactions": totals.count or 0,
         "total_income": float(total_income),
         "total_expense": float(total_expense),
         "net_balance": float(total_income - total_expense),
     }
 
+
+@router.post("/stats/reconcile")
+async def reconcile_stats(
+    repair: bool = False,
+    user_id: Optional[int] = None,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Compare monthly rollups and user stats with raw transactions (admin only)
+    With repair=true, drifted tables are rebuilt from raw transactions
+    """
+    rollup_drift = find_rollup_drift(db, user_id)
+    stats_drift = find_user_stats_drift(db, user_id)
+
+    if repair:
+        if rollup_drift:
+            rebuild_rollups(db, user_id)
+        if stats_drift:
+            rebuild_user_stats(db, user_id)
+
+    return {
+        "rollup_drift": len(rollup_drift),
+        "user_stats_drift": len(stats_drift),
+        "drifted_users": sorted(
+            {row["user_id"] for row in rollup_drift + stats_drift}
+        ),
+        "repaired": repair and bool(rollup_drift or stats_drift),
+    }
@@ -23,7 +23,9 @@ from ..security import (
     authenticate_user,
     create_access_token,
     get_current_user,
-    get_password_hash,
+    get_password_hash_async,
+    invalidate_cached_user,
+    verify_password_async,
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -45,7 +47,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     new_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
     )
 
     db.add(new_user)
@@ -66,7 +68,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     """
     Login user - REQ-F-003
     """
-    user = authenticate_user(db, credentials.email, credentials.password)
+    user = await authenticate_user(db, credentials.email, credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -125,17 +127,16 @@ async def change_password(
     """
     Change user password - REQ-F-018
     """
-    from ..security import verify_password
-
     # Verify old password
-    if not verify_password(data.old_password, current_user.password_hash):
+    if not await verify_password_async(data.old_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect current password"
         )
 
     # Update password
-    current_user.password_hash = get_password_hash(data.new_password)
+    current_user.password_hash = await get_password_hash_async(data.new_password)
     db.commit()
+    invalidate_cached_user(current_user.id)
 
     return MessageResponse(message="Password changed successfully", success=True)
 
@@ -8,24 +8,32 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from ..database import get_db
+from ..etags import check_etag
 from ..models import Category, User
+from ..rollups import bump_data_version
 from ..schemas import CategoryCreate, CategoryResponse, CategoryUpdate, MessageResponse
 from ..security import get_current_user
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
-@router.get("/", response_model=List[CategoryResponse])
+@router.get(
+    "/", response_model=List[CategoryResponse], dependencies=[Depends(check_etag)]
+)
 async def get_categories(
     current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ):
     """
     Get all categories (default + user's custom categories) - REQ-F-011
     """
-    # Get default categories and user's custom categories
+    return list_categories(db, current_user.id)
+
+
+def list_categories(db: Session, user_id: int) -> List[CategoryResponse]:
+    """Default categories plus the user's custom categories - REQ-F-011"""
     categories = (
         db.query(Category)
-        .filter((Category.is_default == True) | (Category.user_id == current_user.id))
+        .filter((Category.is_default == True) | (Category.user_id == user_id))
         .all()
     )
 
@@ -64,6 +72,7 @@ async def create_category(
     )
 
     db.add(new_category)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(new_category)
 
@@ -106,6 +115,8 @@ async def update_category(
     if category_data.type is not None:
         category.type = category_data.type.value
 
+    # Names and types appear in cached analytics
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(category)
 
@@ -142,7 +153,7 @@ async def delete_category(
         )
 
     # Check if category has transactions
-    from ..models import Transaction
+    from ..models import MonthlyRollup, Transaction
 
     has_transactions = (
         db.query(Transaction).filter(Transaction.category_id == category_id).first()
@@ -154,7 +165,13 @@ async def delete_category(
             detail="Cannot delete category with existing transactions",
         )
 
+    # Rollup rows outlive their last transaction with a zero count, and
+    # would block the delete where foreign keys are enforced
+    db.query(MonthlyRollup).filter(MonthlyRollup.category_id == category_id).delete(
+        synchronize_session=False
+    )
     db.delete(category)
+    bump_data_version(db, current_user.id)
     db.commit()
 
     return MessageResponse(message="Category deleted successfully", success=True)
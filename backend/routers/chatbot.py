@@ -2,7 +2,10 @@
 Chatbot API endpoints for financial advice and analysis
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
@@ -10,10 +13,24 @@ from typing import Optional
 from ..database import get_db
 from ..security import get_current_user
 from ..models import User
-from ..chatbot_service import chatbot
+from ..chatbot_service import FinancialChatbot, get_chatbot
 
 router = APIRouter(prefix="/chatbot", tags=["chatbot"])
 
+# Default page size of the recent transactions returned with financial data
+CHAT_SAMPLE_LIMIT = 20
+
+
+def require_chatbot() -> FinancialChatbot:
+    """Dependency: the shared chatbot, or 503 when no LLM backend is configured"""
+    try:
+        return get_chatbot()
+    except (ImportError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Chatbot is not available: {str(e)}"
+        ) from e
+
 
 class ChatMessage(BaseModel):
     """Chat message request model"""
@@ -26,6 +43,7 @@ class ChatResponse(BaseModel):
     success: bool
     response: str
     financial_summary: Optional[dict] = None
+    usage: Optional[dict] = None
     error: Optional[str] = None
 
 
@@ -33,7 +51,8 @@ class ChatResponse(BaseModel):
 async def chat_with_bot(
     chat_message: ChatMessage,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    chatbot: FinancialChatbot = Depends(require_chatbot)
 ):
     """
     Chat with the financial AI bot
@@ -42,6 +61,7 @@ async def chat_with_bot(
         chat_message: The user's message and analysis period
         current_user: Current authenticated user
         db: Database session
+        chatbot: Shared chatbot instance
     
     Returns:
         AI response with financial analysis and advice
@@ -55,7 +75,7 @@ async def chat_with_bot(
             )
         
         # Get AI response
-        result = chatbot.chat_with_user(
+        result = await chatbot.chat_with_user(
             db=db,
             user_id=current_user.id,
             message=chat_message.message,
@@ -71,7 +91,8 @@ async def chat_with_bot(
         return ChatResponse(
             success=True,
             response=result['response'],
-            financial_summary=result.get('financial_summary')
+            financial_summary=result.get('financial_summary'),
+            usage=result.get('usage')
         )
         
     except HTTPException:
@@ -83,19 +104,72 @@ async def chat_with_bot(
         ) from e
 
 
+@router.post("/chat/stream")
+async def chat_with_bot_stream(
+    chat_message: ChatMessage,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    chatbot: FinancialChatbot = Depends(require_chatbot)
+):
+    """
+    Chat with the financial AI bot, streaming the answer as Server-Sent Events
+    
+    Emits `delta` events ({"text": ...}) as the model generates text, then a
+    single `done` event with the financial summary, or an `error` event
+    """
+    if chat_message.days < 1 or chat_message.days > 365:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Days parameter must be between 1 and 365"
+        )
+    
+    bind = db.get_bind()
+    user_id = current_user.id
+    
+    async def event_stream():
+        # The request session is released before the body is sent, so tools
+        # read through their own session on the same engine
+        stream_db = Session(bind=bind)
+        try:
+            async for event, data in chatbot.stream_chat_with_user(
+                db=stream_db,
+                user_id=user_id,
+                message=chat_message.message,
+                days=chat_message.days
+            ):
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            error = {"success": False, "error": f"Lỗi khi xử lý yêu cầu: {str(e)}"}
+            yield f"event: error\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+        finally:
+            stream_db.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/financial-summary")
 async def get_financial_summary(
     days: int = 30,
+    limit: int = Query(CHAT_SAMPLE_LIMIT, ge=0, le=500),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    chatbot: FinancialChatbot = Depends(require_chatbot)
 ):
     """
     Get financial summary for the user
     
     Args:
         days: Number of days to analyze (default 30)
+        limit: Page size of the recent transactions sample (0 to omit it)
+        offset: Offset into the recent transactions sample
         current_user: Current authenticated user
         db: Database session
+        chatbot: Shared chatbot instance
     
     Returns:
         Financial summary data
@@ -110,7 +184,9 @@ async def get_financial_summary(
         financial_data = chatbot.get_user_financial_data(
             db=db,
             user_id=current_user.id,
-            days=days
+            days=days,
+            sample_limit=limit,
+            sample_offset=offset
         )
         
         return {
@@ -128,16 +204,22 @@ async def get_financial_summary(
 @router.get("/spending-analysis")
 async def get_spending_analysis(
     days: int = 30,
+    limit: int = Query(CHAT_SAMPLE_LIMIT, ge=0, le=500),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    chatbot: FinancialChatbot = Depends(require_chatbot)
 ):
     """
     Get spending pattern analysis
     
     Args:
         days: Number of days to analyze (default 30)
+        limit: Page size of the recent transactions sample (0 to omit it)
+        offset: Offset into the recent transactions sample
         current_user: Current authenticated user
         db: Database session
+        chatbot: Shared chatbot instance
     
     Returns:
         Spending analysis and recommendations
@@ -152,7 +234,9 @@ async def get_spending_analysis(
         financial_data = chatbot.get_user_financial_data(
             db=db,
             user_id=current_user.id,
-            days=days
+            days=days,
+            sample_limit=limit,
+            sample_offset=offset
         )
         
         spending_analysis = chatbot.analyze_spending_patterns(financial_data)
@@ -176,7 +260,8 @@ async def get_spending_analysis(
 async def get_quick_financial_advice(
     days: int = 30,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    chatbot: FinancialChatbot = Depends(require_chatbot)
 ):
     """
     Get quick financial advice without chat interaction
@@ -185,6 +270,7 @@ async def get_quick_financial_advice(
         days: Number of days to analyze (default 30)
         current_user: Current authenticated user
         db: Database session
+        chatbot: Shared chatbot instance
     
     Returns:
         Quick financial advice
@@ -202,7 +288,7 @@ async def get_quick_financial_advice(
             days=days
         )
         
-        advice = chatbot.generate_financial_advice(financial_data)
+        advice = await chatbot.generate_financial_advice(financial_data)
         
         return {
             "success": True,
@@ -221,13 +307,16 @@ async def get_quick_financial_advice(
             detail=f"Error generating advice: {str(e)}"
         ) from e
 
+
 @router.post("/clear-history")
 async def clear_conversation_history(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    chatbot: FinancialChatbot = Depends(require_chatbot)
 ):
     """Xóa lịch sử trò chuyện của user"""
     try:
-        chatbot_service._clear_history(current_user.id)
+        chatbot.clear_history(db, current_user.id)
         return {
             "success": True,
             "message": "Đã xóa lịch sử trò chuyện"
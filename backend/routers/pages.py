@@ -0,0 +1,95 @@
+"""
+Page bundle router - one request per web page
+Each endpoint returns everything a frontend page renders from a single auth
+check and database session, instead of one round trip per resource
+"""
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..analytics_service import (build_category_breakdown,
+                                 build_financial_summary,
+                                 build_monthly_comparison, current_month,
+                                 query_category_totals, query_monthly_totals)
+from ..database import get_db
+from ..etags import check_etag
+from ..models import User
+from ..response_cache import cached_response
+from ..schemas import (AnalyticsPageResponse, TransactionResponse,
+                       TransactionsPageResponse, TransactionType)
+from ..security import get_current_user
+from .categories import list_categories
+from .transactions import list_transactions
+
+router = APIRouter(prefix="/pages", tags=["Pages"], dependencies=[Depends(check_etag)])
+
+
+@router.get("/transactions", response_model=TransactionsPageResponse)
+async def get_transactions_page(
+    category_id: Optional[int] = Query(None),
+    type: Optional[TransactionType] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    search: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Transactions page: filtered transactions and the categories for the
+    filter - REQ-F-007, REQ-F-010, REQ-F-011
+    """
+    transactions, next_cursor = list_transactions(
+        db, current_user.id, category_id, type, start_date, end_date, search,
+        skip, limit, cursor,
+    )
+
+    return TransactionsPageResponse(
+        transactions=[TransactionResponse.from_orm(t) for t in transactions],
+        categories=list_categories(db, current_user.id),
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/analytics", response_model=AnalyticsPageResponse)
+async def get_analytics_page(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    breakdown_type: TransactionType = Query(TransactionType.EXPENSE),
+    months: int = Query(6, ge=1, le=24),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Analytics page: summary, category breakdown for the pie chart and
+    monthly comparison for the bar chart - REQ-F-013 to REQ-F-015
+    The summary and the breakdown share one grouped query over the period
+    """
+    if not start_date or not end_date:
+        start_date, end_date = current_month()
+
+    def build():
+        totals = query_category_totals(db, current_user.id, start_date, end_date)
+        monthly_totals = query_monthly_totals(db, current_user.id)
+
+        return AnalyticsPageResponse(
+            summary=build_financial_summary(totals, start_date, end_date),
+            category_breakdown=build_category_breakdown(totals, breakdown_type.value),
+            monthly_comparison=build_monthly_comparison(monthly_totals, months),
+        )
+
+    return cached_response(
+        db, current_user.id, "pages/analytics",
+        {
+            "start_date": start_date,
+            "end_date": end_date,
+            "breakdown_type": breakdown_type,
+            "months": months,
+        },
+        build,
+    )
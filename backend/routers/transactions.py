@@ -2,74 +2,352 @@
 Transaction management router - REQ-F-006 to REQ-F-010
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import base64
+import binascii
+import codecs
+import csv
+import io
+import json
+from fastapi import (APIRouter, Depends, File, HTTPException, Query, Response,
+                     UploadFile, status)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional
+from sqlalchemy import and_, insert, or_, select, tuple_
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import date
 from ..database import get_db
+from ..etags import check_etag
 from ..models import User, Transaction, Category
+from ..rollups import apply_inserted_rows
 from ..schemas import (
+    BulkImportError,
+    BulkImportResponse,
+    TransactionBulkCreate,
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
     MessageResponse,
     TransactionType,
+    ExportFormat,
 )
 from ..security import get_current_user
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ("id", "date", "type", "amount", "category", "description", "notes")
+BULK_INSERT_CHUNK_SIZE = 500
 
-@router.get("/", response_model=List[TransactionResponse])
-async def get_transactions(
-    category_id: Optional[int] = Query(None),
-    type: Optional[TransactionType] = Query(None),
-    start_date: Optional[date] = Query(None),
-    end_date: Optional[date] = Query(None),
-    search: Optional[str] = Query(None),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
+
+def encode_cursor(transaction: Transaction) -> str:
     """
-    Get all transactions with filtering - REQ-F-007, REQ-F-010
+    Build an opaque keyset cursor pointing just after a transaction
     """
-    query = db.query(Transaction).filter(
-        Transaction.user_id == current_user.id, Transaction.is_deleted == False
-    )
+    payload = json.dumps({"d": transaction.date.isoformat(), "i": transaction.id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    Decode a keyset cursor into its (date, id) position
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return date.fromisoformat(payload["d"]), int(payload["i"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def transaction_filters(
+    user_id: int,
+    category_id: Optional[int] = None,
+    type: Optional[TransactionType] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None,
+) -> list:
+    """
+    Build the filter conditions shared by listing and export - REQ-F-010
+    """
+    filters = [Transaction.user_id == user_id, Transaction.is_deleted == False]
 
-    # Apply filters - REQ-F-010
     if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+        filters.append(Transaction.category_id == category_id)
 
     if type:
-        query = query.filter(Transaction.type == type.value)
+        filters.append(Transaction.type == type.value)
 
     if start_date:
-        query = query.filter(Transaction.date >= start_date)
+        filters.append(Transaction.date >= start_date)
 
     if end_date:
-        query = query.filter(Transaction.date <= end_date)
+        filters.append(Transaction.date <= end_date)
 
     if search:
         search_pattern = f"%{search}%"
-        query = query.filter(
+        filters.append(
             or_(
                 Transaction.description.ilike(search_pattern),
                 Transaction.notes.ilike(search_pattern),
             )
         )
 
-    # Order by date descending (newest first) - REQ-F-007
-    transactions = (
-        query.order_by(Transaction.date.desc()).offset(skip).limit(limit).all()
+    return filters
+
+
+def list_transactions(
+    db: Session,
+    user_id: int,
+    category_id: Optional[int] = None,
+    type: Optional[TransactionType] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Transaction], Optional[str]]:
+    """
+    One page of a user's transactions and the cursor of the next page,
+    or None when this is the last one - REQ-F-007, REQ-F-010
+    """
+    query = db.query(Transaction).filter(
+        *transaction_filters(user_id, category_id, type, start_date, end_date, search)
+    )
+
+    # Order by date descending (newest first), id breaks ties - REQ-F-007
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Transaction.date, Transaction.id) < tuple_(cursor_date, cursor_id)
+        )
+    else:
+        query = query.offset(skip)
+
+    # One extra row tells whether another page follows
+    transactions = query.limit(limit + 1).all()
+
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        return transactions, encode_cursor(transactions[-1])
+
+    return transactions, None
+
+
+def stream_export(bind, statement, export_format: ExportFormat) -> Iterator[str]:
+    """
+    Stream export rows in batches from a dedicated session
+    Rows are fetched server-side with yield_per and written out one batch
+    at a time, so memory stays flat regardless of history size
+    """
+    with Session(bind=bind) as session:
+        result = session.execute(
+            statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        if export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
+
+            for rows in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(
+                        dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, default=str
+                    )
+                    + "\n"
+                    for row in rows
+                )
+
+
+def import_transaction_rows(
+    db: Session, user_id: int, rows: Iterable[Tuple[int, Dict[str, Any]]]
+) -> BulkImportResponse:
+    """
+    Validate and insert (row number, data) pairs in chunks - REQ-F-006
+    Categories are checked against one prefetched map; a row may name its
+    category instead of giving its id. Valid rows are inserted with one
+    executemany per chunk and committed together; invalid rows are reported.
+    """
+    categories = (
+        db.query(Category)
+        .filter(or_(Category.user_id == user_id, Category.is_default == True))
+        .all()
+    )
+    categories_by_id = {category.id: category for category in categories}
+    # A user's own category wins over a default one with the same name
+    categories_by_name = {}
+    for category in sorted(categories, key=lambda c: c.user_id is not None):
+        categories_by_name[category.name] = category
+
+    created = 0
+    errors = []
+    pending = []
+
+    def insert_pending():
+        nonlocal created, pending
+        db.execute(insert(Transaction), pending)
+        apply_inserted_rows(db, pending)
+        created += len(pending)
+        pending = []
+
+    for row_number, data in rows:
+        data = dict(data)
+        category_name = data.pop("category", None)
+        if data.get("category_id") is None and category_name:
+            if not isinstance(category_name, str):
+                errors.append(
+                    BulkImportError(
+                        row=row_number, detail="category: Input should be a valid string"
+                    )
+                )
+                continue
+            category = categories_by_name.get(category_name.strip())
+            if not category:
+                errors.append(
+                    BulkImportError(row=row_number, detail="Category not found")
+                )
+                continue
+            data["category_id"] = category.id
+
+        try:
+            transaction_data = TransactionCreate(**data)
+        except ValidationError as e:
+            detail = "; ".join(
+                f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+            errors.append(BulkImportError(row=row_number, detail=detail))
+            continue
+
+        category = categories_by_id.get(transaction_data.category_id)
+        if not category:
+            errors.append(BulkImportError(row=row_number, detail="Category not found"))
+            continue
+
+        if category.type != transaction_data.type.value:
+            errors.append(
+                BulkImportError(
+                    row=row_number,
+                    detail=f"Category type ({category.type}) does not match transaction type ({transaction_data.type.value})",
+                )
+            )
+            continue
+
+        pending.append(
+            {
+                "amount": transaction_data.amount,
+                "description": transaction_data.description,
+                "date": transaction_data.date,
+                "type": transaction_data.type.value,
+                "category_id": transaction_data.category_id,
+                "notes": transaction_data.notes,
+                "user_id": user_id,
+            }
+        )
+        if len(pending) >= BULK_INSERT_CHUNK_SIZE:
+            insert_pending()
+
+    if pending:
+        insert_pending()
+
+    db.commit()
+
+    return BulkImportResponse(created=created, failed=len(errors), errors=errors)
+
+
+@router.get(
+    "/", response_model=List[TransactionResponse], dependencies=[Depends(check_etag)]
+)
+async def get_transactions(
+    response: Response,
+    category_id: Optional[int] = Query(None),
+    type: Optional[TransactionType] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    search: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(
+        None, description=f"Keyset cursor from the {NEXT_CURSOR_HEADER} header"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Get all transactions with filtering - REQ-F-007, REQ-F-010
+    Pages are ordered by (date, id) descending. When more rows follow, the
+    cursor for the next page is returned in the X-Next-Cursor header; passing
+    it back as `cursor` costs the same on every page, unlike `skip`.
+    """
+    transactions, next_cursor = list_transactions(
+        db, current_user.id, category_id, type, start_date, end_date, search,
+        skip, limit, cursor,
     )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     return [TransactionResponse.from_orm(t) for t in transactions]
 
 
+@router.get("/export")
+async def export_transactions(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    category_id: Optional[int] = Query(None),
+    type: Optional[TransactionType] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    search: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Export filtered transactions as streamed CSV or NDJSON - REQ-F-010
+    """
+    statement = (
+        select(
+            Transaction.id,
+            Transaction.date,
+            Transaction.type,
+            Transaction.amount,
+            Category.name,
+            Transaction.description,
+            Transaction.notes,
+        )
+        .join(Category, Transaction.category_id == Category.id)
+        .where(
+            *transaction_filters(
+                current_user.id, category_id, type, start_date, end_date, search
+            )
+        )
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+    )
+
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    filename = f"transactions.{format.value}"
+
+    # The request session is released before the body is sent, so the
+    # stream reads through its own session on the same engine
+    return StreamingResponse(
+        stream_export(db.get_bind(), statement, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: int,
@@ -147,6 +425,47 @@ async def create_transaction(
     return TransactionResponse.from_orm(new_transaction)
 
 
+# Bulk imports are plain `def` handlers so the CPU-bound validation and
+# inserts run in the threadpool instead of on the event loop
+@router.post("/bulk", response_model=BulkImportResponse)
+def bulk_create_transactions(
+    payload: TransactionBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Create many transactions in one request - REQ-F-006
+    Errors are reported per row, using the row's index in the list
+    """
+    return import_transaction_rows(
+        db, current_user.id, enumerate(payload.transactions)
+    )
+
+
+@router.post("/bulk/csv", response_model=BulkImportResponse)
+def bulk_import_csv(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Import transactions from an uploaded CSV file - REQ-F-006
+    Columns: amount, description, date, type, category_id or category (name),
+    notes. The file is read row by row and inserted in chunks; errors are
+    reported with the CSV line number.
+    """
+    reader = csv.DictReader(codecs.iterdecode(file.file, "utf-8-sig"))
+    rows = (
+        (
+            reader.line_num,
+            {key: value for key, value in row.items() if key and value},
+        )
+        for row in reader
+    )
+
+    return import_transaction_rows(db, current_user.id, rows)
+
+
 @router.put("/{transaction_id}", response_model=TransactionResponse)
 async def update_transaction(
     transaction_id: int,
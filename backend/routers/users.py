@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import User
 from ..schemas import UserUpdate, UserResponse, MessageResponse
-from ..security import get_current_user
+from ..security import get_current_user, invalidate_cached_user
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -43,6 +43,7 @@ async def update_profile(
         current_user.full_name = user_data.full_name
 
     db.commit()
+    invalidate_cached_user(current_user.id)
     db.refresh(current_user)
 
     return UserResponse.from_orm(current_user)
@@ -57,5 +58,6 @@ async def delete_account(
     """
     current_user.is_active = False
     db.commit()
+    invalidate_cached_user(current_user.id)
 
     return MessageResponse(message="Account deactivated successfully", success=True)
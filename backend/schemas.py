@@ -4,7 +4,7 @@ Pydantic schemas for request/response validation
 
 from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field, validator
 
@@ -16,6 +16,13 @@ class TransactionType(str, Enum):
     EXPENSE = "expense"
 
 
+class ExportFormat(str, Enum):
+    """Transaction export format"""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
 # User Schemas
 class UserBase(BaseModel):
     """Base user schema"""
@@ -151,6 +158,28 @@ class TransactionResponse(TransactionBase):
         from_attributes = True
 
 
+class TransactionBulkCreate(BaseModel):
+    """Bulk transaction import schema - REQ-F-006
+    Rows are validated one by one so a bad row is reported, not fatal"""
+
+    transactions: List[Dict[str, Any]] = Field(..., min_length=1, max_length=10000)
+
+
+class BulkImportError(BaseModel):
+    """A rejected row of a bulk import"""
+
+    row: int
+    detail: str
+
+
+class BulkImportResponse(BaseModel):
+    """Bulk transaction import result"""
+
+    created: int
+    failed: int
+    errors: List[BulkImportError] = []
+
+
 class TransactionFilter(BaseModel):
     """Transaction filter schema - REQ-F-010"""
 
@@ -225,6 +254,23 @@ class AnalyticsResponse(BaseModel):
     recent_transactions: List[RecentTransactionResponse] = []
 
 
+# Page Schemas
+class TransactionsPageResponse(BaseModel):
+    """Everything the transactions page renders, in one response"""
+
+    transactions: List[TransactionResponse]
+    categories: List[CategoryResponse]
+    next_cursor: Optional[str] = None
+
+
+class AnalyticsPageResponse(BaseModel):
+    """Everything the analytics page renders, in one response"""
+
+    summary: FinancialSummary
+    category_breakdown: List[CategoryBreakdown]
+    monthly_comparison: List[MonthlyComparison]
+
+
 # Generic Response
 class MessageResponse(BaseModel):
     """Generic message response"""
@@ -246,6 +292,25 @@ class UserAdminResponse(UserResponse):
         from_attributes = True
 
 
+class UserSortField(str, Enum):
+    """Sortable fields of the admin user listing"""
+
+    ID = "id"
+    CREATED_AT = "created_at"
+    FULL_NAME = "full_name"
+    EMAIL = "email"
+    TRANSACTION_COUNT = "transaction_count"
+    TOTAL_INCOME = "total_income"
+    TOTAL_EXPENSE = "total_expense"
+
+
+class SortOrder(str, Enum):
+    """Sort direction"""
+
+    ASC = "asc"
+    DESC = "desc"
+
+
 class UserAdminUpdate(BaseModel):
     """Admin user update schema"""
 
@@ -3,6 +3,11 @@ Security utilities for authentication and authorization
 REQ-NF-002, REQ-NF-005, REQ-NF-006
 """
 
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -10,8 +15,10 @@ import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from .cache import TTLCache
 from .config import settings
 from .database import get_db
 from .models import User
@@ -19,6 +26,20 @@ from .models import User
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# bcrypt is CPU bound (~200ms), so it runs on its own bounded pool instead of
+# the event loop; a login burst then only queues auth requests
+_password_pool = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt"
+)
+_password_jobs_lock = threading.Lock()
+_password_jobs = 0
+_password_jobs_rejected = 0
+
+# Decoded tokens by sha256 and active-user column snapshots by id; writes
+# that change a user call invalidate_cached_user
+token_cache = TTLCache(settings.auth_cache_max_size, settings.auth_cache_ttl_seconds)
+user_cache = TTLCache(settings.auth_cache_max_size, settings.auth_cache_ttl_seconds)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -38,6 +59,64 @@ def get_password_hash(password: str) -> str:
     return hashed.decode("utf-8")
 
 
+async def _run_password_job(func, *args):
+    """
+    Run a bcrypt call on the password pool
+    Raises 503 once workers + max queue jobs are already in flight
+    """
+    global _password_jobs, _password_jobs_rejected
+
+    with _password_jobs_lock:
+        limit = settings.password_hash_workers + settings.password_hash_max_queue
+        if _password_jobs >= limit:
+            _password_jobs_rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        _password_jobs += 1
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_pool, func, *args)
+    finally:
+        with _password_jobs_lock:
+            _password_jobs -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password without blocking the event loop
+    """
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop - REQ-F-002
+    """
+    return await _run_password_job(get_password_hash, password)
+
+
+def password_pool_stats() -> dict:
+    """
+    Password pool metrics: in-flight jobs, queue depth and rejections
+    """
+    with _password_jobs_lock:
+        in_flight = _password_jobs
+        rejected = _password_jobs_rejected
+
+    workers = settings.password_hash_workers
+    return {
+        "workers": workers,
+        "max_queue": settings.password_hash_max_queue,
+        "in_flight": in_flight,
+        "queue_depth": max(0, in_flight - workers),
+        "rejected": rejected,
+    }
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token - REQ-NF-006
@@ -70,6 +149,53 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
+def _decode_cached_token(token: str) -> Optional[dict]:
+    """
+    Decode a token, reusing the payload of a recently seen identical token
+    """
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        token_cache.delete(key)
+
+    payload = decode_access_token(token)
+    remaining = payload.get("exp", 0) - time.time() if payload else 0
+    if remaining > 0:
+        token_cache.set(key, payload, ttl=min(token_cache.ttl, remaining))
+    return payload
+
+
+def _load_active_user(db: Session, user_id: int) -> Optional[User]:
+    """
+    Active user attached to `db`, built from the cache without a query
+    when possible
+    """
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None or not user.is_active:
+        return None
+
+    user_cache.set(
+        user_id,
+        {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs},
+    )
+    return user
+
+
+def invalidate_cached_user(user_id: int):
+    """
+    Drop a user from the auth cache after changing or deleting it
+    """
+    user_cache.delete(user_id)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
@@ -84,7 +210,7 @@ async def get_current_user(
     )
 
     token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = _decode_cached_token(token)
 
     if payload is None:
         raise credentials_exception
@@ -98,21 +224,21 @@ async def get_current_user(
     except (ValueError, TypeError):
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None or not user.is_active:
+    user = _load_active_user(db, user_id)
+    if user is None:
         raise credentials_exception
 
     return user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """
     Authenticate a user by email and password - REQ-F-003
     """
     user = db.query(User).filter(User.email == email).first()
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return None
     return user
 
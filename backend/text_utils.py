@@ -0,0 +1,24 @@
+"""
+Text helpers for matching Vietnamese user input
+"""
+
+import re
+import unicodedata
+
+# Vietnamese diacritics decompose into marks from this block under NFD
+_COMBINING_MARKS = re.compile("[\u0300-\u036f]+")
+_WORDS = re.compile(r"\w+")
+
+
+def remove_vietnamese_accents(text: str) -> str:
+    """Remove Vietnamese accents and diacritics, including đ/Đ"""
+    stripped = _COMBINING_MARKS.sub("", unicodedata.normalize("NFD", text))
+    return stripped.replace("đ", "d").replace("Đ", "D")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a message for cache keys and keyword matching:
+    lowercased, accents stripped, punctuation dropped, whitespace collapsed
+    """
+    return " ".join(_WORDS.findall(remove_vietnamese_accents(text.lower())))
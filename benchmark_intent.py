@@ -0,0 +1,100 @@
+"""
+Micro-benchmark of chatbot intent classification
+Compares the compiled classifier with the per-keyword substring scans it
+replaced, over a corpus of Vietnamese chat messages
+Usage: python benchmark_intent.py [--repeat 2000]
+"""
+
+import argparse
+import timeit
+
+from backend.intent import (DATA_KEYWORDS, FINANCE_KEYWORDS, GENERAL_KEYWORDS,
+                            GREETING_KEYWORDS, GREETING_MAX_WORDS, classify_intent)
+from backend.text_utils import normalize_text
+
+CORPUS = [
+    "Xin chào",
+    "Chào bạn",
+    "hello",
+    "Hôm nay trời đẹp quá",
+    "Mình đang buồn",
+    "Bạn thích màu gì?",
+    "Thủ đô Việt Nam ở đâu?",
+    "Làm sao để tiết kiệm tiền?",
+    "lam sao de tiet kiem tien",
+    "Quy tắc 50/30/20 là gì?",
+    "Giải thích lãi kép giúp mình",
+    "Tôi nên đầu tư vào đâu với 10 triệu?",
+    "Có nên mua vàng lúc này không?",
+    "Tháng này tôi chi bao nhiêu tiền?",
+    "Phân tích chi tiêu của tôi",
+    "Top chi tiêu tháng trước của tôi là gì",
+    "Thu nhập của tôi tháng này thế nào",
+    "Danh mục của tôi nào tốn nhiều tiền nhất?",
+    "Tôi chi bao nhiêu cho ăn uống tuần này?",
+    "Lập ngân sách hàng tháng thế nào cho hợp lý?",
+    "Cảm ơn bạn nhiều nhé!",
+    "Có",
+    "Thế nào?",
+    "Mình muốn quản lý tài chính tốt hơn, bắt đầu từ đâu?",
+    "Dữ liệu của tôi có an toàn không?",
+    "Làm thế nào để tăng lương?",
+    "Giao dịch hôm qua của mình bị sai số tiền",
+    "Kể cho mình một câu chuyện vui đi",
+]
+
+
+def substring_scan(message: str):
+    """The previous implementation: lowercase and one `in` test per keyword"""
+    lower = message.lower()
+    greeting = (
+        any(keyword in lower.strip() for keyword in GREETING_KEYWORDS)
+        and len(message.split()) <= GREETING_MAX_WORDS
+    )
+    finance = any(keyword in lower for keyword in FINANCE_KEYWORDS)
+    if not finance:
+        general = True
+    else:
+        has_general = any(keyword in lower for keyword in GENERAL_KEYWORDS)
+        has_data = any(keyword in lower for keyword in DATA_KEYWORDS)
+        general = has_general and not has_data
+    return greeting, finance, general
+
+
+def substring_scan_per_request(message: str):
+    """Call pattern of the old chat turn: each check repeated where needed"""
+    substring_scan(message)  # greeting check in the agent
+    substring_scan(message)  # general check in the agent
+    substring_scan(message)  # finance + general checks for the summary
+    normalize_text(message)  # response cache key
+
+
+def run(repeat: int):
+    messages = CORPUS * repeat
+    print(f"📊 {len(messages)} messages ({len(CORPUS)} distinct)")
+
+    results = {
+        "substring scan, once": lambda: [substring_scan(m) for m in messages],
+        "substring scan, per request": lambda: [
+            substring_scan_per_request(m) for m in messages
+        ],
+        "compiled classifier": lambda: [classify_intent(m) for m in messages],
+    }
+    for name, fn in results.items():
+        seconds = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"  {name:<28} {seconds * 1e6 / len(messages):7.2f} µs/message")
+
+    for message in CORPUS:
+        intent = classify_intent(message)
+        print(
+            f"  {'G' if intent.greeting else '-'}"
+            f"{'F' if intent.finance else '-'}"
+            f"{'Q' if intent.general else '-'}  {message}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.repeat)
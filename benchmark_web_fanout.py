@@ -0,0 +1,126 @@
+"""
+Benchmark of the Django pages that fetch several backend resources
+Renders the admin dashboard view against a local stub backend that answers
+every call after a fixed delay, once with the backend calls made one after
+another (the old view) and once concurrently. The analytics and transactions
+pages fetch a single /api/pages/ bundle and are timed on their own
+Usage: python benchmark_web_fanout.py [--delay-ms 50] [--requests 20]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "frontend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.messages.storage.cookie import CookieStorage  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from web import api_client, views  # noqa: E402
+
+STUB_RESPONSES = {
+    "/api/analytics/summary": {"total_income": 0, "total_expense": 0, "balance": 0},
+    "/api/analytics/category-breakdown": [],
+    "/api/analytics/monthly-comparison": [],
+    "/api/admin/stats": {"total_users": 0, "active_users": 0},
+    "/api/admin/users": [],
+    "/api/transactions/": [],
+    "/api/categories/": [],
+    "/api/pages/analytics": {"summary": {}, "category_breakdown": [], "monthly_comparison": []},
+    "/api/pages/transactions": {"transactions": [], "categories": [], "next_cursor": None},
+}
+
+
+def start_stub_backend(delay: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; avoid delayed-ACK stalls
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps(STUB_RESPONSES.get(self.path.split("?")[0], {})).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def sequential_get_all(*calls, **kwargs):
+    """The old views: one backend call after another"""
+    responses = []
+    for call in calls:
+        path, params = (call, None) if isinstance(call, str) else call
+        responses.append(api_client.get(path, params=params, **kwargs))
+    return responses
+
+
+def render(view, path):
+    request = RequestFactory().get(path)
+    request.session = {
+        "access_token": "benchmark",
+        "user": {"id": 1, "email": "admin@example.com", "full_name": "Admin", "is_admin": True},
+    }
+    request._messages = CookieStorage(request)
+    response = view(request)
+    assert response.status_code == 200, response.status_code
+
+
+def measure(view, path, count):
+    render(view, path)  # warm up connections and templates
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        render(view, path)
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000
+
+
+def run(args):
+    logging.getLogger("web.api_client").setLevel(logging.WARNING)
+    server = start_stub_backend(args.delay_ms / 1000)
+    settings.FASTAPI_BASE_URL = f"http://127.0.0.1:{server.server_port}/api"
+    print(f"📊 Stub backend answers every call after {args.delay_ms}ms")
+
+    pages = [
+        ("admin dashboard (2 calls)", views.admin_dashboard, "/admin-dashboard/"),
+    ]
+    for name, view, path in pages:
+        with mock.patch.object(api_client, "get_all", sequential_get_all):
+            before = measure(view, path, args.requests)
+        after = measure(view, path, args.requests)
+        print(f"  {name:<26} sequential {before:6.1f}ms   concurrent {after:6.1f}ms (p50)")
+
+    for name, view, path in [
+        ("analytics (1 call)", views.analytics, "/analytics/"),
+        ("transactions (1 call)", views.transactions, "/transactions/"),
+    ]:
+        print(f"  {name:<26} bundled    {measure(view, path, args.requests):6.1f}ms (p50)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay-ms", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20)
+    run(parser.parse_args())
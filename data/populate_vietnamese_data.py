@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from vietnamese_transaction_generator import generate_user_transactions
 from vietnamese_user_data_generator import generate_all_users
 
+from backend import rollups  # noqa: F401 - keeps monthly rollups in sync
 from backend.database import Base, SessionLocal, engine
 from backend.models import Category, Transaction, User
 from backend.security import get_password_hash
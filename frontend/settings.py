@@ -127,3 +127,24 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # FastAPI Backend URL
 FASTAPI_BASE_URL = "http://127.0.0.1:8001/api"
+
+# Pooled HTTP client used by the views to call the backend (web/api_client.py)
+FASTAPI_CONNECT_TIMEOUT = 3.05
+FASTAPI_READ_TIMEOUT = 30
+FASTAPI_POOL_SIZE = 20
+FASTAPI_RETRIES = 2
+FASTAPI_RETRY_BACKOFF = 0.2
+# Threads shared by all pages for concurrent backend GETs (api_client.get_all)
+FASTAPI_FANOUT_WORKERS = 16
+# GET responses kept per process for If-None-Match revalidation (LRU)
+FASTAPI_ETAG_CACHE_SIZE = 512
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        # Per-call backend latency; raise to WARNING to only log failures
+        "web.api_client": {"handlers": ["console"], "level": "INFO"},
+    },
+}
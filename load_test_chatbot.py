@@ -0,0 +1,95 @@
+"""
+Script to load-test the chatbot endpoint while probing /api/health
+Start the backend offline first:  LLM_BACKEND=fake python run_backend.py
+Usage: python load_test_chatbot.py --email EMAIL --password PASSWORD
+       [--requests 200] [--concurrency 50] [--base-url http://127.0.0.1:8001]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args) -> bool:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120) as client:
+        response = await client.post(
+            "/api/auth/login", json={"email": args.email, "password": args.password}
+        )
+        if response.status_code != 200:
+            print(f"❌ Login failed: {response.status_code} {response.text}")
+            return False
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        chat_latencies = []
+        health_latencies = []
+        failures = 0
+        semaphore = asyncio.Semaphore(args.concurrency)
+        done = asyncio.Event()
+
+        async def chat(i):
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/chatbot/chat",
+                    headers=headers,
+                    json={"message": f"Tháng này tôi chi bao nhiêu tiền? #{i}"},
+                )
+                chat_latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    failures += 1
+
+        async def probe_health():
+            # Health latency shows whether chat traffic stalls the event loop
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/api/health")
+                health_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        print(
+            f"🚀 Sending {args.requests} chat requests "
+            f"with concurrency {args.concurrency}..."
+        )
+        probe = asyncio.create_task(probe_health())
+        started = time.perf_counter()
+        await asyncio.gather(*(chat(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+    print(f"✅ Throughput: {args.requests / elapsed:.1f} req/s over {elapsed:.1f}s")
+    print(
+        f"📊 Chat latency   p50 {statistics.median(chat_latencies) * 1000:.0f}ms  "
+        f"p95 {percentile(chat_latencies, 95) * 1000:.0f}ms"
+    )
+    print(
+        f"📊 Health latency p50 {statistics.median(health_latencies) * 1000:.0f}ms  "
+        f"p95 {percentile(health_latencies, 95) * 1000:.0f}ms"
+    )
+    if failures:
+        print(f"❌ {failures} chat requests failed")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+    args = parser.parse_args()
+
+    sys.exit(0 if asyncio.run(run(args)) else 1)
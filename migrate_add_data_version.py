@@ -0,0 +1,35 @@
+"""
+Migration script to add the data_version column to the user_stats table
+Usage: python migrate_add_data_version.py
+"""
+
+from sqlalchemy import inspect, text
+
+from backend.database import engine
+
+
+def migrate():
+    """Add data_version column to user_stats"""
+    inspector = inspect(engine)
+    if not inspector.has_table("user_stats"):
+        print("✅ Table 'user_stats' does not exist yet; it is created on startup")
+        return
+
+    columns = [column["name"] for column in inspector.get_columns("user_stats")]
+    if "data_version" in columns:
+        print("✅ Column 'data_version' already exists!")
+        return
+
+    print("Adding 'data_version' column to user_stats table...")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "ALTER TABLE user_stats "
+                "ADD COLUMN data_version INTEGER NOT NULL DEFAULT 1"
+            )
+        )
+    print("✅ Successfully added 'data_version' column!")
+
+
+if __name__ == "__main__":
+    migrate()
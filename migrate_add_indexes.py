@@ -0,0 +1,45 @@
+"""
+Migration script to add the composite transaction indexes
+Creates any missing index without rewriting the table; on PostgreSQL the
+indexes are built CONCURRENTLY so reads and writes keep flowing
+Usage: python migrate_add_indexes.py
+"""
+
+from sqlalchemy import inspect, text
+
+from backend.database import engine
+from backend.models import Transaction
+
+
+def migrate():
+    """Create missing indexes on the transactions table"""
+    existing = {index["name"] for index in inspect(engine).get_indexes("transactions")}
+    missing = [
+        index for index in Transaction.__table__.indexes if index.name not in existing
+    ]
+
+    if not missing:
+        print("✅ All transaction indexes already exist!")
+        return
+
+    is_postgres = engine.dialect.name == "postgresql"
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index in missing:
+            print(f"Creating index '{index.name}'...")
+            if is_postgres:
+                index.dialect_options["postgresql"]["concurrently"] = True
+            index.create(bind=conn, checkfirst=True)
+            print(f"✅ Created '{index.name}'")
+
+        # Refresh planner statistics so the new indexes get picked up
+        conn.execute(text("ANALYZE transactions"))
+
+    print("\n📋 Current indexes on transactions table:")
+    for index in inspect(engine).get_indexes("transactions"):
+        print(f"  • {index['name']} ({', '.join(index['column_names'])})")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,81 @@
+"""
+Script to rebuild or verify monthly rollups and user stats against raw transactions
+Usage: python rebuild_rollups.py [--verify] [--user-id ID]
+"""
+
+import argparse
+import sys
+
+from backend.database import SessionLocal
+from backend.rollups import (find_rollup_drift, find_user_stats_drift,
+                             rebuild_rollups, rebuild_user_stats)
+
+
+def verify(user_id=None) -> bool:
+    """Report rollup and user stats rows that drifted from raw transactions"""
+    db = SessionLocal()
+    try:
+        drift = find_rollup_drift(db, user_id)
+        stats_drift = find_user_stats_drift(db, user_id)
+
+        if not drift:
+            print("✅ Monthly rollups match raw transactions")
+        else:
+            print(f"❌ Found {len(drift)} drifted rollup rows:")
+            for row in drift:
+                print(
+                    f"  • user {row['user_id']} {row['year']}-{row['month']:02d} "
+                    f"category {row['category_id']} {row['type']}: "
+                    f"stored {row['stored_amount']:,.0f} ({row['stored_count']}) "
+                    f"vs expected {row['expected_amount']:,.0f} ({row['expected_count']})"
+                )
+
+        if not stats_drift:
+            print("✅ User stats match raw transactions")
+        else:
+            print(f"❌ Found {len(stats_drift)} drifted user stats rows:")
+            for row in stats_drift:
+                print(
+                    f"  • user {row['user_id']}: "
+                    f"stored {row['stored_income']:,.0f}/{row['stored_expense']:,.0f} "
+                    f"({row['stored_count']}) vs expected "
+                    f"{row['expected_income']:,.0f}/{row['expected_expense']:,.0f} "
+                    f"({row['expected_count']})"
+                )
+
+        return not drift and not stats_drift
+    finally:
+        db.close()
+
+
+def rebuild(user_id=None) -> bool:
+    """Recompute rollups and user stats from raw transactions"""
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, user_id)
+        print(f"✅ Rebuilt {written} monthly rollup rows")
+        written = rebuild_user_stats(db, user_id)
+        print(f"✅ Rebuilt {written} user stats rows")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--verify", action="store_true", help="only report drift, do not rebuild"
+    )
+    parser.add_argument("--user-id", type=int, help="limit to a single user")
+    args = parser.parse_args()
+
+    if args.verify:
+        ok = verify(args.user_id)
+    else:
+        ok = rebuild(args.user_id)
+
+    sys.exit(0 if ok else 1)
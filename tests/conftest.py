@@ -9,7 +9,9 @@ from sqlalchemy.orm import sessionmaker
 from backend.database import Base, get_db
 from backend.main import app
 from backend.models import User, Category
-from backend.security import get_password_hash
+from backend.chatbot_service import chat_response_cache, financial_snapshot_cache
+from backend.response_cache import analytics_cache
+from backend.security import get_password_hash, token_cache, user_cache
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -40,6 +42,8 @@ def db_session():
         db.add(category)
 
     db.commit()
+    # Cached answers are keyed by user ids, which repeat across test databases
+    chat_response_cache.clear()
 
     try:
         yield db
@@ -59,6 +63,11 @@ def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    # Ids are reused once the test database is dropped
+    token_cache.clear()
+    user_cache.clear()
+    financial_snapshot_cache.clear()
+    analytics_cache.clear()
 
     with TestClient(app) as test_client:
         yield test_client
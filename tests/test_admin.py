@@ -0,0 +1,165 @@
+"""
+Tests for admin user management
+"""
+
+import pytest
+from fastapi import status
+from datetime import date
+
+
+@pytest.fixture
+def admin_headers(client, db_session):
+    """Create an admin user and return its authentication headers"""
+    from backend.models import User
+    from backend.security import get_password_hash
+
+    admin = User(
+        email="admin@example.com",
+        full_name="Admin User",
+        password_hash=get_password_hash("adminpassword123"),
+        is_admin=True,
+    )
+    db_session.add(admin)
+    db_session.commit()
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "admin@example.com", "password": "adminpassword123"},
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def spenders(db_session):
+    """Create users with different spending"""
+    from backend.models import Category, Transaction, User
+
+    expense_cat = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+    income_cat = db_session.query(Category).filter(Category.name == "Lương").first()
+
+    users = []
+    for i, expense in enumerate([30000, 90000, 60000]):
+        user = User(
+            email=f"spender{i}@example.com",
+            full_name=f"Spender {i}",
+            password_hash="x",
+        )
+        db_session.add(user)
+        db_session.flush()
+        db_session.add_all(
+            [
+                Transaction(
+                    amount=expense,
+                    description="Food",
+                    date=date.today(),
+                    type="expense",
+                    category_id=expense_cat.id,
+                    user_id=user.id,
+                ),
+                Transaction(
+                    amount=500000,
+                    description="Salary",
+                    date=date.today(),
+                    type="income",
+                    category_id=income_cat.id,
+                    user_id=user.id,
+                ),
+                Transaction(
+                    amount=999999,
+                    description="Deleted",
+                    date=date.today(),
+                    type="expense",
+                    category_id=expense_cat.id,
+                    user_id=user.id,
+                    is_deleted=True,
+                ),
+            ]
+        )
+        users.append(user)
+    db_session.commit()
+    return users
+
+
+class TestAdminUserListing:
+    """Test admin user listing with statistics"""
+
+    def test_list_users_with_stats(self, client, admin_headers, spenders):
+        """Test every user carries its lifetime statistics"""
+        response = client.get("/api/admin/users", headers=admin_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        users = {u["email"]: u for u in response.json()}
+        assert users["admin@example.com"]["transaction_count"] == 0
+        assert users["spender1@example.com"]["total_expense"] == 90000
+        assert users["spender1@example.com"]["total_income"] == 500000
+        assert users["spender1@example.com"]["transaction_count"] == 2
+
+    def test_top_spenders(self, client, admin_headers, spenders):
+        """Test sorting and filtering by statistics"""
+        response = client.get(
+            "/api/admin/users?sort_by=total_expense&order=desc&min_total_expense=50000",
+            headers=admin_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [u["full_name"] for u in response.json()] == ["Spender 1", "Spender 2"]
+
+    def test_listing_requires_admin(self, client, auth_headers):
+        """Test non-admin users are rejected"""
+        response = client.get("/api/admin/users", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestAdminUserDetail:
+    """Test admin user detail statistics"""
+
+    def test_user_detail_stats(self, client, admin_headers, spenders):
+        """Test detail statistics match the listing"""
+        response = client.get(
+            f"/api/admin/users/{spenders[2].id}", headers=admin_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total_expense"] == 60000
+        assert data["total_income"] == 500000
+        assert data["transaction_count"] == 2
+
+
+class TestAdminStats:
+    """Test system statistics served from user_stats"""
+
+    def test_admin_stats_totals(self, client, admin_headers, spenders):
+        """Test totals exclude soft-deleted transactions"""
+        response = client.get("/api/admin/stats", headers=admin_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total_users"] == 4
+        assert data["admin_users"] == 1
+        assert data["total_transactions"] == 6
+        assert data["total_expense"] == 180000
+        assert data["total_income"] == 1500000
+
+    def test_reconcile_repairs_drift(self, client, admin_headers, spenders, db_session):
+        """Test the reconciliation endpoint detects and repairs drift"""
+        from backend.models import UserStats
+
+        db_session.query(UserStats).filter(
+            UserStats.user_id == spenders[0].id
+        ).update({"transaction_count": 99})
+        db_session.commit()
+
+        response = client.post("/api/admin/stats/reconcile", headers=admin_headers)
+        assert response.json()["drifted_users"] == [spenders[0].id]
+        assert response.json()["repaired"] is False
+
+        response = client.post(
+            "/api/admin/stats/reconcile?repair=true", headers=admin_headers
+        )
+        assert response.json()["repaired"] is True
+
+        response = client.post("/api/admin/stats/reconcile", headers=admin_headers)
+        assert response.json()["user_stats_drift"] == 0
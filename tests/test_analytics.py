@@ -288,6 +288,31 @@ class TestTrendData:
             assert "amount" in item
             assert "type" in item
 
+    def test_trend_defaults_to_current_month(
+        self, client, auth_headers, db_session, test_user, test_category
+    ):
+        """Test trend data without dates covers the current month"""
+        from backend.models import Transaction
+
+        db_session.add(
+            Transaction(
+                amount=50000,
+                description="Food",
+                date=date.today(),
+                type="expense",
+                category_id=test_category.id,
+                user_id=test_user.id,
+            )
+        )
+        db_session.commit()
+
+        response = client.get("/api/analytics/trend", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {"date": str(date.today()), "amount": 50000, "type": "expense"}
+        ]
+
 
 class TestDashboard:
     """Test complete dashboard - combines all analytics"""
@@ -338,3 +363,247 @@ class TestDashboard:
         assert data["summary"]["total_income"] == 1000000
         assert data["summary"]["total_expense"] == 50000
         assert data["summary"]["balance"] == 950000
+
+    def test_dashboard_sections_with_date_range(
+        self, client, auth_headers, db_session, test_user
+    ):
+        """Test dashboard sections share one date range but monthly is all time"""
+        from backend.models import Transaction, Category
+
+        expense_cat = (
+            db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        )
+        income_cat = db_session.query(Category).filter(Category.name == "Lương").first()
+
+        today = date.today()
+        old_day = today - timedelta(days=400)
+
+        transactions = [
+            Transaction(
+                amount=1000000,
+                description="Salary",
+                date=today,
+                type="income",
+                category_id=income_cat.id,
+                user_id=test_user.id,
+            ),
+            Transaction(
+                amount=30000,
+                description="Food 1",
+                date=today,
+                type="expense",
+                category_id=expense_cat.id,
+                user_id=test_user.id,
+            ),
+            Transaction(
+                amount=20000,
+                description="Food 2",
+                date=today,
+                type="expense",
+                category_id=expense_cat.id,
+                user_id=test_user.id,
+            ),
+            Transaction(
+                amount=70000,
+                description="Old food",
+                date=old_day,
+                type="expense",
+                category_id=expense_cat.id,
+                user_id=test_user.id,
+            ),
+            Transaction(
+                amount=90000,
+                description="Deleted",
+                date=today,
+                type="expense",
+                category_id=expense_cat.id,
+                user_id=test_user.id,
+                is_deleted=True,
+            ),
+        ]
+        db_session.add_all(transactions)
+        db_session.commit()
+
+        start_date = today - timedelta(days=30)
+        response = client.get(
+            f"/api/analytics/dashboard?start_date={start_date}&end_date={today}",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        assert data["summary"]["total_income"] == 1000000
+        assert data["summary"]["total_expense"] == 50000
+        assert data["summary"]["transaction_count"] == 3
+        assert data["summary"]["period_start"] == str(today)
+
+        food = next(c for c in data["category_breakdown"] if c["category_name"] == "Ăn uống")
+        assert food["amount"] == 50000
+
+        assert {(t["type"], t["amount"]) for t in data["trend_data"]} == {
+            ("income", 1000000),
+            ("expense", 50000),
+        }
+        assert len(data["recent_transactions"]) == 3
+
+        # Monthly comparison ignores the date range
+        assert sum(m["total_expense"] for m in data["monthly_comparison"]) == 120000
+
+
+class TestAnalyticsCache:
+    """Test analytics responses are cached until the user's data changes"""
+
+    def _add_expense(self, client, auth_headers, category_id, amount):
+        response = client.post(
+            "/api/transactions/",
+            headers=auth_headers,
+            json={
+                "amount": amount,
+                "description": "Food",
+                "date": str(date.today()),
+                "type": "expense",
+                "category_id": category_id,
+            },
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_repeat_request_skips_aggregation(
+        self, client, auth_headers, test_category
+    ):
+        """Test a repeat request is answered without aggregate queries"""
+        from sqlalchemy import event
+        from tests.conftest import engine
+
+        self._add_expense(client, auth_headers, test_category.id, 50000)
+        first = client.get("/api/analytics/dashboard", headers=auth_headers)
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            second = client.get("/api/analytics/dashboard", headers=auth_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert second.json() == first.json()
+        assert not [s for s in statements if "sum(" in s.lower()]
+
+        stats = client.get("/api/metrics").json()["analytics_cache"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_transaction_write_invalidates(
+        self, client, auth_headers, test_category
+    ):
+        """Test creating a transaction refreshes cached summaries"""
+        self._add_expense(client, auth_headers, test_category.id, 50000)
+        before = client.get("/api/analytics/summary", headers=auth_headers).json()
+
+        self._add_expense(client, auth_headers, test_category.id, 30000)
+        after = client.get("/api/analytics/summary", headers=auth_headers).json()
+
+        assert before["total_expense"] == 50000
+        assert after["total_expense"] == 80000
+
+    def test_category_rename_invalidates(
+        self, client, auth_headers, test_category
+    ):
+        """Test renaming a category refreshes cached breakdowns"""
+        self._add_expense(client, auth_headers, test_category.id, 50000)
+        client.get("/api/analytics/category-breakdown", headers=auth_headers)
+
+        response = client.put(
+            f"/api/categories/{test_category.id}",
+            headers=auth_headers,
+            json={"name": "Renamed"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        breakdown = client.get(
+            "/api/analytics/category-breakdown", headers=auth_headers
+        ).json()
+        assert [c["category_name"] for c in breakdown] == ["Renamed"]
+
+    def test_cache_is_per_user(self, client, auth_headers, db_session, test_category):
+        """Test users never see each other's cached responses"""
+        from backend.models import User
+        from backend.security import get_password_hash
+
+        self._add_expense(client, auth_headers, test_category.id, 50000)
+        client.get("/api/analytics/summary", headers=auth_headers)
+
+        db_session.add(
+            User(
+                email="other@example.com",
+                full_name="Other User",
+                password_hash=get_password_hash("otherpassword123"),
+            )
+        )
+        db_session.commit()
+        token = client.post(
+            "/api/auth/login",
+            json={"email": "other@example.com", "password": "otherpassword123"},
+        ).json()["access_token"]
+
+        summary = client.get(
+            "/api/analytics/summary", headers={"Authorization": f"Bearer {token}"}
+        ).json()
+        assert summary["total_expense"] == 0
+
+
+class TestDatabaseResponseCache:
+    """Test the shared response cache backend"""
+
+    def test_round_trip_and_version(self, db_session):
+        """Test entries are returned only for the version they were stored at"""
+        from backend.response_cache import DatabaseResponseCache
+
+        cache = DatabaseResponseCache(ttl=60)
+        cache.set(db_session, 1, 3, "key", {"total": 1.5, "items": ["Ăn uống"]})
+
+        assert cache.get(db_session, 1, 3, "key") == {"total": 1.5, "items": ["Ăn uống"]}
+        assert cache.get(db_session, 1, 4, "key") is None
+        assert cache.get(db_session, 2, 3, "key") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    def test_new_version_drops_old_rows(self, db_session):
+        """Test storing a newer version deletes the user's stale rows"""
+        from backend.models import CachedResponse
+        from backend.response_cache import DatabaseResponseCache
+
+        cache = DatabaseResponseCache(ttl=60)
+        cache.set(db_session, 1, 1, "a", [1])
+        cache.set(db_session, 1, 1, "b", [2])
+        cache.set(db_session, 2, 1, "a", [3])
+        cache.set(db_session, 1, 2, "a", [4])
+
+        rows = db_session.query(CachedResponse.user_id, CachedResponse.cache_key).all()
+        assert sorted(rows) == [(1, "a"), (2, "a")]
+        assert cache.get(db_session, 1, 2, "a") == [4]
+
+    def test_invalidate_user_and_prune(self, db_session):
+        """Test invalidation and TTL pruning delete rows"""
+        from datetime import datetime
+
+        from backend.models import CachedResponse
+        from backend.response_cache import DatabaseResponseCache
+
+        cache = DatabaseResponseCache(ttl=60)
+        cache.set(db_session, 1, 1, "a", [1])
+        cache.set(db_session, 2, 1, "a", [2])
+        cache.invalidate_user(db_session, 1)
+
+        assert cache.get(db_session, 1, 1, "a") is None
+
+        db_session.query(CachedResponse).update(
+            {CachedResponse.created_at: datetime.utcnow() - timedelta(seconds=120)}
+        )
+        db_session.commit()
+
+        assert cache.get(db_session, 2, 1, "a") is None
+        assert cache.prune(db_session) == 1
@@ -102,6 +102,26 @@ class TestUserLogin:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+    def test_login_rejected_when_password_pool_full(self, client, test_user, monkeypatch):
+        """Test login returns 503 instead of queueing past the limit"""
+        from backend.config import settings
+
+        monkeypatch.setattr(
+            settings, "password_hash_max_queue", -settings.password_hash_workers
+        )
+        response = client.post(
+            "/api/auth/login",
+            json={"email": "test@example.com", "password": "testpassword123"},
+        )
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+
+        metrics = client.get("/api/metrics").json()["password_pool"]
+        assert metrics["in_flight"] == 0
+        assert metrics["rejected"] >= 1
+
+
 class TestPasswordManagement:
     """Test password management - REQ-F-004, REQ-F-018"""
 
@@ -179,3 +199,39 @@ class TestAuthentication:
         data = response.json()
         assert data["email"] == "test@example.com"
         assert data["full_name"] == "Test User"
+
+
+class TestAuthCache:
+    """Test the authenticated-user cache"""
+
+    def test_cached_user_skips_query(self, client, auth_headers):
+        """Test repeat requests do not load the user from the database"""
+        from sqlalchemy import event
+        from tests.conftest import engine
+
+        client.get("/api/auth/me", headers=auth_headers)
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.get("/api/auth/me", headers=auth_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["email"] == "test@example.com"
+        assert not [s for s in statements if "FROM users" in s]
+
+    def test_deactivation_takes_effect_immediately(self, client, auth_headers):
+        """Test deactivating an account invalidates the cached user"""
+        client.get("/api/auth/me", headers=auth_headers)
+
+        response = client.delete("/api/users/account", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -114,6 +114,48 @@ class TestCategoryDeletion:
         assert response.status_code == status.HTTP_200_OK
         assert response.json()["success"] is True
 
+    def test_delete_category_emptied_by_moves(
+        self, client, auth_headers, db_session, test_user, test_category
+    ):
+        """Test a category whose transactions moved away can be deleted"""
+        from datetime import date
+
+        from sqlalchemy import event
+        from backend.models import Category
+        from tests.conftest import engine
+
+        other = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        response = client.post(
+            "/api/transactions/",
+            headers=auth_headers,
+            json={
+                "amount": 50000,
+                "description": "Lunch",
+                "date": str(date.today()),
+                "type": "expense",
+                "category_id": test_category.id,
+            },
+        )
+        client.put(
+            f"/api/transactions/{response.json()['id']}",
+            headers=auth_headers,
+            json={"category_id": other.id},
+        )
+
+        def enforce_foreign_keys(dbapi_connection, connection_record, connection_proxy):
+            dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+        category_id = test_category.id
+        event.listen(engine, "checkout", enforce_foreign_keys)
+        try:
+            db_session.close()
+            response = client.delete(f"/api/categories/{category_id}", headers=auth_headers)
+        finally:
+            event.remove(engine, "checkout", enforce_foreign_keys)
+            db_session.close()
+
+        assert response.status_code == status.HTTP_200_OK
+
     def test_delete_default_category_forbidden(self, client, auth_headers, db_session):
         """Test that default categories cannot be deleted"""
         from backend.models import Category
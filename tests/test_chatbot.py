@@ -0,0 +1,660 @@
+"""
+Tests for the chatbot endpoints, run against the offline fake LLM backend
+"""
+
+import asyncio
+
+import pytest
+from fastapi import status
+
+from backend.llm_backends import FakeLLMBackend
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Install a shared chatbot backed by a local fake LLM"""
+    import backend.chatbot_service as chatbot_service
+
+    backend = FakeLLMBackend(reply="Câu trả lời thử nghiệm")
+    monkeypatch.setattr(
+        chatbot_service, "_chatbot", chatbot_service.FinancialChatbot(backend=backend)
+    )
+    return backend
+
+
+class TestChat:
+    """Test the chat pipeline"""
+
+    def test_general_question(self, client, auth_headers, fake_llm):
+        """Test a general question is answered by the backend"""
+        response = client.post(
+            "/api/chatbot/chat",
+            headers=auth_headers,
+            json={"message": "Bạn thích màu gì?"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["response"] == "Câu trả lời thử nghiệm"
+        assert fake_llm.calls == 1
+
+    def test_tool_call_round_trip(self, client, auth_headers, fake_llm):
+        """Test a function call is executed and answered in a second call"""
+        fake_llm.tool_call = "get_financial_summary"
+
+        response = client.post(
+            "/api/chatbot/chat",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["response"] == "Câu trả lời thử nghiệm"
+        assert fake_llm.calls == 2
+
+    def test_unconfigured_backend_returns_503(self, client, auth_headers, monkeypatch):
+        """Test chat routes report 503 instead of failing at import time"""
+        import backend.chatbot_service as chatbot_service
+        from backend.config import settings
+
+        monkeypatch.setattr(chatbot_service, "_chatbot", None)
+        monkeypatch.setattr(settings, "llm_backend", "gemini")
+        monkeypatch.setattr(settings, "gemini_api_key", "")
+
+        response = client.post(
+            "/api/chatbot/chat", headers=auth_headers, json={"message": "hi"}
+        )
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert chatbot_service._chatbot is None
+
+    def test_llm_timeout(self, client, auth_headers, fake_llm, monkeypatch):
+        """Test a slow backend is cut off with a friendly reply"""
+        from backend.config import settings
+
+        monkeypatch.setattr(settings, "llm_timeout_seconds", 0.01)
+        fake_llm.latency = 1
+
+        response = client.post(
+            "/api/chatbot/chat",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "chậm" in response.json()["response"]
+
+
+class TestConcurrencyLimit:
+    """Test LLM calls are capped by the limiter"""
+
+    def test_limiter_caps_in_flight_calls(self, monkeypatch):
+        """Test no more than LLM_MAX_CONCURRENCY calls run at once"""
+        from backend.chatbot_service import FinancialChatbot
+        from backend.config import settings
+
+        monkeypatch.setattr(settings, "llm_max_concurrency", 2)
+        backend = FakeLLMBackend(latency=0.01)
+        bot = FinancialChatbot(backend=backend)
+
+        async def burst():
+            await asyncio.gather(*(bot._generate("hi") for _ in range(6)))
+
+        asyncio.run(burst())
+
+        assert backend.calls == 6
+        assert backend.max_in_flight == 2
+
+
+def _sse_events(body: str):
+    """Parse a Server-Sent Events body into (event, data) pairs"""
+    import json
+
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestChatStream:
+    """Test the streaming chat endpoint"""
+
+    def test_stream_general_question(self, client, auth_headers, fake_llm):
+        """Test text arrives as several delta events followed by done"""
+        response = client.post(
+            "/api/chatbot/chat/stream",
+            headers=auth_headers,
+            json={"message": "Bạn thích màu gì?"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _sse_events(response.text)
+        deltas = [data["text"] for event, data in events if event == "delta"]
+        assert len(deltas) > 1
+        assert "".join(deltas) == "Câu trả lời thử nghiệm"
+        assert events[-1][0] == "done"
+        assert events[-1][1]["success"] is True
+        assert events[-1][1]["usage"]["llm_calls"] == 1
+
+    def test_stream_with_tool_call(self, client, auth_headers, fake_llm, db_session):
+        """Test a tool call in the stream is executed before the answer"""
+        fake_llm.tool_call = "get_financial_summary"
+
+        response = client.post(
+            "/api/chatbot/chat/stream",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        events = _sse_events(response.text)
+        text = "".join(data["text"] for event, data in events if event == "delta")
+        assert text == "Câu trả lời thử nghiệm"
+        assert events[-1][0] == "done"
+        assert events[-1][1]["financial_summary"]["total_expense"] == 0
+        assert fake_llm.calls == 2
+
+    def test_stream_rejects_bad_days(self, client, auth_headers, fake_llm):
+        """Test validation happens before the stream starts"""
+        response = client.post(
+            "/api/chatbot/chat/stream",
+            headers=auth_headers,
+            json={"message": "hi", "days": 0},
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestConcurrentChats:
+    """Test tool calls stay scoped to their own request"""
+
+    def test_parallel_chats_use_their_own_user(self, db_session, test_user):
+        """Test interleaved tool calls read each user's own data"""
+        import json
+        from datetime import date
+
+        from backend.chatbot_service import FinancialChatbot
+        from backend.models import Category, Transaction, User
+
+        category = db_session.query(Category).filter(Category.name == "Lương").first()
+        other = User(email="other@example.com", full_name="Other", password_hash="x")
+        db_session.add(other)
+        db_session.flush()
+        for user, amount in [(test_user, 1000000), (other, 2000000)]:
+            db_session.add(
+                Transaction(
+                    amount=amount,
+                    description="Salary",
+                    date=date.today(),
+                    type="income",
+                    category_id=category.id,
+                    user_id=user.id,
+                )
+            )
+        db_session.commit()
+
+        backend = FakeLLMBackend(latency=0.01, tool_call="get_financial_summary")
+        bot = FinancialChatbot(backend=backend)
+        question = "Tháng này tôi chi bao nhiêu tiền?"
+
+        async def both():
+            await asyncio.gather(
+                bot.generate_financial_advice_with_agent(question, db_session, test_user.id),
+                bot.generate_financial_advice_with_agent(question, db_session, other.id),
+            )
+
+        asyncio.run(both())
+
+        # Follow-up requests carry the tool result for their own user
+        results = [
+            json.loads(contents[2]["parts"][0]["function_response"]["response"]["result"])
+            for contents in backend.requests
+            if isinstance(contents, list) and len(contents) > 1
+        ]
+        assert sorted(r["total_income"] for r in results) == [1000000, 2000000]
+
+
+class TestAgentLoop:
+    """Test the bounded tool-calling loop"""
+
+    def test_parallel_calls_answered_in_one_follow_up(
+        self, client, auth_headers, fake_llm
+    ):
+        """Test every function call of a step goes back in a single request"""
+        fake_llm.tool_call = ["get_financial_summary", "get_top_expenses"]
+
+        response = client.post(
+            "/api/chatbot/chat",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert fake_llm.calls == 2
+        follow_up = fake_llm.requests[-1]
+        assert len(follow_up[1]["parts"]) == 2
+        assert [p["function_response"]["name"] for p in follow_up[2]["parts"]] == [
+            "get_financial_summary",
+            "get_top_expenses",
+        ]
+        usage = response.json()["usage"]
+        assert usage["steps"] == 2
+        assert usage["tool_calls"] == 2
+        assert usage["total_tokens"] > 0
+
+    def test_calls_of_one_step_overlap(
+        self, client, auth_headers, fake_llm, db_session, monkeypatch
+    ):
+        """Test a step's calls run concurrently, each with its own session"""
+        import threading
+
+        import backend.chatbot_service as chatbot_service
+
+        fake_llm.tool_call = ["get_financial_summary", "get_top_expenses"]
+        # Both calls must be running at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        sessions = []
+
+        def execute_tool(context, tool_name, parameters):
+            sessions.append(context.db)
+            barrier.wait()
+            return "{}"
+
+        monkeypatch.setattr(chatbot_service._chatbot, "_execute_tool", execute_tool)
+
+        response = client.post(
+            "/api/chatbot/chat",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["usage"]["tool_calls"] == 2
+        assert len({id(db) for db in sessions}) == 2
+        assert db_session not in sessions
+
+    def test_step_cap_forces_final_answer(
+        self, client, auth_headers, fake_llm, monkeypatch
+    ):
+        """Test a model that keeps calling tools is cut off at the step cap"""
+        from backend.config import settings
+
+        monkeypatch.setattr(settings, "chat_agent_max_steps", 2)
+        fake_llm.tool_call = "get_financial_summary"
+        fake_llm.tool_rounds = 10
+
+        response = client.post(
+            "/api/chatbot/chat",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        assert response.json()["response"] == "Câu trả lời thử nghiệm"
+        usage = response.json()["usage"]
+        assert usage["steps"] == 2
+        assert usage["tool_calls"] == 2
+        assert fake_llm.calls == 3
+        # The final call replays function calls, so it still declares the
+        # tools, with function calling turned off
+        final_config = fake_llm.configs[-1]
+        assert final_config["tools"] == fake_llm.configs[0]["tools"]
+        assert final_config["tool_config"]["function_calling_config"]["mode"] == "NONE"
+
+    def test_token_budget_stops_loop(
+        self, client, auth_headers, fake_llm, monkeypatch
+    ):
+        """Test the token budget ends the loop after the first step"""
+        from backend.config import settings
+
+        monkeypatch.setattr(settings, "chat_agent_token_budget", 1)
+        fake_llm.tool_call = "get_financial_summary"
+        fake_llm.tool_rounds = 10
+
+        response = client.post(
+            "/api/chatbot/chat/stream",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        events = _sse_events(response.text)
+        text = "".join(data["text"] for event, data in events if event == "delta")
+        assert text == "Câu trả lời thử nghiệm"
+        assert events[-1][1]["usage"]["steps"] == 1
+        assert fake_llm.calls == 2
+        assert fake_llm.configs[-1]["tools"]
+        assert fake_llm.configs[-1]["tool_config"]["function_calling_config"]["mode"] == "NONE"
+
+
+class TestConversationHistory:
+    """Test conversation history is bounded and shared through the database"""
+
+    def test_history_reaches_prompt_and_clears(self, client, auth_headers, fake_llm):
+        """Test earlier messages are in the prompt until history is cleared"""
+        for message in ["Mình thích màu xanh", "Bạn thích màu gì?"]:
+            client.post(
+                "/api/chatbot/chat", headers=auth_headers, json={"message": message}
+            )
+        assert "Mình thích màu xanh" in fake_llm.requests[-1]
+
+        response = client.post("/api/chatbot/clear-history", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        client.post(
+            "/api/chatbot/chat", headers=auth_headers, json={"message": "Bạn thích màu gì?"}
+        )
+        assert "Mình thích màu xanh" not in fake_llm.requests[-1]
+
+    def test_database_store_is_shared_and_capped(self, db_session, test_user):
+        """Test a second store instance, as in another worker, sees the history"""
+        from backend.chat_history import DatabaseHistoryStore
+
+        writer = DatabaseHistoryStore(max_messages=4, idle_ttl=3600)
+        reader = DatabaseHistoryStore(max_messages=4, idle_ttl=3600)
+        for i in range(6):
+            writer.append(db_session, test_user.id, "user", f"message {i}")
+
+        history = reader.get(db_session, test_user.id)
+        assert [item["message"] for item in history] == [
+            "message 2",
+            "message 3",
+            "message 4",
+            "message 5",
+        ]
+
+    def test_database_store_prunes_idle_history(self, db_session, test_user):
+        """Test messages older than the idle TTL are hidden, then pruned"""
+        from datetime import datetime, timedelta
+
+        from backend.chat_history import DatabaseHistoryStore
+        from backend.models import ChatMessage
+
+        store = DatabaseHistoryStore(max_messages=10, idle_ttl=60)
+        db_session.add(
+            ChatMessage(
+                user_id=test_user.id,
+                role="user",
+                message="old",
+                created_at=datetime.utcnow() - timedelta(minutes=5),
+            )
+        )
+        db_session.commit()
+
+        assert store.get(db_session, test_user.id) == []
+        assert store.prune(db_session) == 1
+
+    def test_memory_store_evicts_least_recent_user(self):
+        """Test the memory store is bounded by user count and message count"""
+        from backend.chat_history import MemoryHistoryStore
+
+        store = MemoryHistoryStore(max_messages=2, idle_ttl=3600, max_users=2)
+        for user_id in (1, 2, 1, 3):
+            for i in range(3):
+                store.append(None, user_id, "user", f"{user_id}-{i}")
+
+        assert store.get(None, 2) == []
+        assert [item["message"] for item in store.get(None, 1)] == ["1-1", "1-2"]
+        assert store.stats()["size"] == 2
+
+
+class TestResponseCache:
+    """Test repeated questions are answered from the response cache"""
+
+    def test_normalize_text(self):
+        """Test case, accents, punctuation and spacing are ignored"""
+        from backend.text_utils import normalize_text
+
+        assert normalize_text("  Làm sao để   TIẾT KIỆM tiền? ") == "lam sao de tiet kiem tien"
+        assert normalize_text("Đầu tư là gì") == "dau tu la gi"
+
+    def test_general_question_shared_across_spellings(
+        self, client, auth_headers, fake_llm
+    ):
+        """Test near-identical general questions reach the LLM once"""
+        for message in ["Làm sao để tiết kiệm tiền?", "lam sao de  TIET KIEM tien"]:
+            response = client.post(
+                "/api/chatbot/chat", headers=auth_headers, json={"message": message}
+            )
+            assert response.json()["response"] == "Câu trả lời thử nghiệm"
+
+        assert fake_llm.calls == 1
+        assert response.json()["usage"]["cached"] is True
+        stats = client.get("/api/metrics").json()["chat_response_cache"]
+        assert stats["hits"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_answers_with_conversation_context_not_stored(
+        self, client, auth_headers, fake_llm
+    ):
+        """Test a general answer that saw earlier turns is not shared"""
+        for message in ["Mình thích màu xanh lá", "Bạn thích màu gì nhất?"]:
+            client.post(
+                "/api/chatbot/chat", headers=auth_headers, json={"message": message}
+            )
+
+        from backend.chatbot_service import chat_response_cache
+
+        assert chat_response_cache.stats()["size"] == 1
+
+    def test_personal_answer_keyed_by_data_version(
+        self, client, auth_headers, fake_llm, db_session
+    ):
+        """Test a personal answer is reused until the user's data changes"""
+        from datetime import date
+
+        from backend.models import Category
+
+        fake_llm.tool_call = "get_financial_summary"
+        question = {"message": "Tháng này tôi chi bao nhiêu tiền?"}
+        client.post("/api/chatbot/chat", headers=auth_headers, json=question)
+        client.post("/api/chatbot/chat", headers=auth_headers, json=question)
+        assert fake_llm.calls == 2
+
+        category = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        client.post(
+            "/api/transactions/",
+            headers=auth_headers,
+            json={
+                "amount": 25000,
+                "description": "Coffee",
+                "date": str(date.today()),
+                "type": "expense",
+                "category_id": category.id,
+            },
+        )
+        client.post("/api/chatbot/chat", headers=auth_headers, json=question)
+        assert fake_llm.calls == 4
+
+
+class TestIntent:
+    """Test messages are classified once, by the compiled classifier"""
+
+    @pytest.mark.parametrize(
+        "message, greeting, finance, general",
+        [
+            ("Xin chào", True, False, True),
+            ("Bạn thích màu gì?", False, False, True),
+            ("Làm sao để tiết kiệm tiền?", False, True, True),
+            ("Tháng này tôi chi bao nhiêu tiền?", False, True, False),
+            ("Làm sao giảm top chi tiêu của tôi?", False, True, False),
+            ("lam sao de tiet kiem", False, True, True),
+        ],
+    )
+    def test_classify_intent(self, message, greeting, finance, general):
+        """Test keyword flags, including unaccented multi-word keywords"""
+        from backend.intent import classify_intent
+
+        intent = classify_intent(message)
+        assert (intent.greeting, intent.finance, intent.general) == (
+            greeting,
+            finance,
+            general,
+        )
+
+    def test_classified_once_per_request(
+        self, client, auth_headers, fake_llm, monkeypatch
+    ):
+        """Test a chat turn classifies its message a single time"""
+        import backend.chatbot_service as chatbot_service
+
+        calls = []
+        original = chatbot_service.classify_intent
+
+        def counting(message):
+            calls.append(message)
+            return original(message)
+
+        monkeypatch.setattr(chatbot_service, "classify_intent", counting)
+        fake_llm.tool_call = "get_financial_summary"
+
+        response = client.post(
+            "/api/chatbot/chat",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        assert response.json()["financial_summary"] is not None
+        assert len(calls) == 1
+
+
+@pytest.fixture
+def year_of_transactions(db_session, test_user):
+    """One expense every three days for a year, plus a monthly salary"""
+    from datetime import date, timedelta
+
+    from backend.models import Category, Transaction
+
+    food = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+    salary = db_session.query(Category).filter(Category.name == "Lương").first()
+    today = date.today()
+
+    rows = [
+        Transaction(
+            amount=10000,
+            description=f"Meal {i}",
+            date=today - timedelta(days=i),
+            type="expense",
+            category_id=food.id,
+            user_id=test_user.id,
+        )
+        for i in range(0, 360, 3)
+    ]
+    rows += [
+        Transaction(
+            amount=5000000,
+            description="Salary",
+            date=today - timedelta(days=30 * i),
+            type="income",
+            category_id=salary.id,
+            user_id=test_user.id,
+        )
+        for i in range(12)
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+class TestFinancialData:
+    """Test chatbot financial data is aggregated in SQL"""
+
+    def test_summary_aggregates_with_capped_sample(
+        self, client, auth_headers, fake_llm, year_of_transactions
+    ):
+        """Test totals cover the window while the sample is paged"""
+        response = client.get(
+            "/api/chatbot/financial-summary?days=365&limit=10&offset=5",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()["data"]
+        assert data["transaction_count"] == 132
+        assert data["total_expense"] == 1200000
+        assert data["total_income"] == 60000000
+        assert data["top_expense_categories"] == [["Ăn uống", 1200000]]
+        assert sum(data["daily_expenses"].values()) == 1200000
+        assert len(data["transactions"]) == 10
+        assert data["transactions"][0]["category"] in ("Ăn uống", "Lương")
+
+    def test_query_count_is_constant(
+        self, client, auth_headers, fake_llm, year_of_transactions
+    ):
+        """Test categories are not lazy-loaded once per transaction"""
+        from sqlalchemy import event
+        from tests.conftest import engine
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.get(
+                "/api/chatbot/spending-analysis?days=365&limit=50",
+                headers=auth_headers,
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["financial_data"]["transactions"]) == 50
+        assert len(statements) < 10
+
+
+class TestFinancialSnapshotCache:
+    """Test financial snapshots are computed once per data version"""
+
+    def test_chat_turn_computes_aggregates_once(
+        self, client, auth_headers, fake_llm, monkeypatch
+    ):
+        """Test the tool call and the summary share one snapshot"""
+        from backend.chatbot_service import FinancialChatbot
+
+        computed = []
+        original = FinancialChatbot._compute_financial_snapshot
+
+        def counting(self, db, user_id, days, today):
+            computed.append(days)
+            return original(self, db, user_id, days, today)
+
+        monkeypatch.setattr(FinancialChatbot, "_compute_financial_snapshot", counting)
+        fake_llm.tool_call = "get_financial_summary"
+        fake_llm.tool_args = {"days": 30}
+
+        response = client.post(
+            "/api/chatbot/chat",
+            headers=auth_headers,
+            json={"message": "Tháng này tôi chi bao nhiêu tiền?"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["financial_summary"]["total_expense"] == 0
+        assert computed == [30]
+
+    def test_transaction_write_invalidates(
+        self, client, auth_headers, fake_llm, db_session
+    ):
+        """Test a new transaction is visible in the next snapshot"""
+        from datetime import date
+
+        from backend.models import Category
+
+        url = "/api/chatbot/financial-summary?days=30"
+        assert client.get(url, headers=auth_headers).json()["data"]["total_expense"] == 0
+
+        category = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        client.post(
+            "/api/transactions/",
+            headers=auth_headers,
+            json={
+                "amount": 25000,
+                "description": "Coffee",
+                "date": str(date.today()),
+                "type": "expense",
+                "category_id": category.id,
+            },
+        )
+
+        data = client.get(url, headers=auth_headers).json()["data"]
+        assert data["total_expense"] == 25000
@@ -0,0 +1,141 @@
+"""
+Tests for ETag / If-None-Match on read endpoints
+"""
+
+from datetime import date
+
+import pytest
+from fastapi import status
+
+READ_ENDPOINTS = [
+    "/api/analytics/summary",
+    "/api/analytics/dashboard",
+    "/api/transactions/",
+    "/api/categories/",
+    "/api/pages/analytics",
+    "/api/pages/transactions",
+]
+
+
+def _add_expense(client, auth_headers, category_id, amount=50000):
+    response = client.post(
+        "/api/transactions/",
+        headers=auth_headers,
+        json={
+            "amount": amount,
+            "description": "Food",
+            "date": str(date.today()),
+            "type": "expense",
+            "category_id": category_id,
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+class TestConditionalGet:
+    """Test read endpoints answer 304 while the user's data is unchanged"""
+
+    @pytest.mark.parametrize("path", READ_ENDPOINTS)
+    def test_matching_etag_returns_304(self, client, auth_headers, test_category, path):
+        """Test a revalidation with the current ETag gets an empty 304"""
+        _add_expense(client, auth_headers, test_category.id)
+
+        first = client.get(path, headers=auth_headers)
+        etag = first.headers["ETag"]
+        second = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+
+        assert first.status_code == status.HTTP_200_OK
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second.headers["ETag"] == etag
+        assert second.content == b""
+
+    def test_304_skips_aggregation(self, client, auth_headers, test_category):
+        """Test a 304 is answered before any aggregate query runs"""
+        from sqlalchemy import event
+        from backend.response_cache import analytics_cache
+        from tests.conftest import engine
+
+        _add_expense(client, auth_headers, test_category.id)
+        etag = client.get("/api/analytics/trend", headers=auth_headers).headers["ETag"]
+        # Drop cached responses, so only the ETag check can avoid the queries
+        analytics_cache.clear()
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.get(
+                "/api/analytics/trend", headers={**auth_headers, "If-None-Match": etag}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not [s for s in statements if "sum(" in s.lower()]
+
+    def test_write_changes_etag(self, client, auth_headers, test_category):
+        """Test editing a transaction invalidates the list's ETag"""
+        transaction = _add_expense(client, auth_headers, test_category.id)
+        etag = client.get("/api/transactions/", headers=auth_headers).headers["ETag"]
+
+        client.put(
+            f"/api/transactions/{transaction['id']}",
+            headers=auth_headers,
+            json={"description": "Dinner"},
+        )
+        response = client.get(
+            "/api/transactions/", headers={**auth_headers, "If-None-Match": etag}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert response.json()[0]["description"] == "Dinner"
+
+    def test_new_category_changes_etag(self, client, auth_headers):
+        """Test creating a category invalidates the category list's ETag"""
+        etag = client.get("/api/categories/", headers=auth_headers).headers["ETag"]
+
+        client.post(
+            "/api/categories/",
+            headers=auth_headers,
+            json={"name": "Giải trí", "type": "expense"},
+        )
+        response = client.get(
+            "/api/categories/", headers={**auth_headers, "If-None-Match": etag}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Giải trí" in [c["name"] for c in response.json()]
+
+    def test_etag_depends_on_query(self, client, auth_headers):
+        """Test different filters of the same endpoint get different ETags"""
+        expense = client.get(
+            "/api/analytics/category-breakdown?type=expense", headers=auth_headers
+        )
+        income = client.get(
+            "/api/analytics/category-breakdown?type=income", headers=auth_headers
+        )
+
+        assert expense.headers["ETag"] != income.headers["ETag"]
+
+    def test_weak_and_listed_validators_match(self, client, auth_headers):
+        """Test If-None-Match uses weak comparison over a list of tags"""
+        etag = client.get("/api/categories/", headers=auth_headers).headers["ETag"]
+
+        response = client.get(
+            "/api/categories/",
+            headers={**auth_headers, "If-None-Match": f'"stale", W/{etag}'},
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_requires_auth(self, client):
+        """Test a validator never bypasses authentication"""
+        response = client.get("/api/categories/", headers={"If-None-Match": "*"})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,158 @@
+"""
+Tests for page bundle endpoints
+"""
+
+from datetime import date, timedelta
+
+from fastapi import status
+
+
+def _add_transactions(db_session, user, count=3):
+    from backend.models import Category, Transaction
+
+    expense_cat = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+    income_cat = db_session.query(Category).filter(Category.name == "Lương").first()
+
+    db_session.add(
+        Transaction(
+            amount=1000000,
+            description="Salary",
+            date=date.today(),
+            type="income",
+            category_id=income_cat.id,
+            user_id=user.id,
+        )
+    )
+    for i in range(count):
+        db_session.add(
+            Transaction(
+                amount=10000 * (i + 1),
+                description=f"Food {i}",
+                date=date.today() - timedelta(days=i),
+                type="expense",
+                category_id=expense_cat.id,
+                user_id=user.id,
+            )
+        )
+    db_session.commit()
+
+
+class TestTransactionsPage:
+    """Test the transactions page bundle"""
+
+    def test_matches_separate_endpoints(
+        self, client, auth_headers, db_session, test_user, test_category
+    ):
+        """Test the bundle returns what /transactions/ and /categories/ return"""
+        _add_transactions(db_session, test_user)
+        params = {"type": "expense"}
+
+        response = client.get(
+            "/api/pages/transactions", headers=auth_headers, params=params
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert page["transactions"] == client.get(
+            "/api/transactions/", headers=auth_headers, params=params
+        ).json()
+        assert page["categories"] == client.get(
+            "/api/categories/", headers=auth_headers
+        ).json()
+        assert page["next_cursor"] is None
+
+    def test_next_cursor(self, client, auth_headers, db_session, test_user):
+        """Test the next page cursor is returned in the body"""
+        _add_transactions(db_session, test_user, count=3)
+
+        page = client.get(
+            "/api/pages/transactions", headers=auth_headers, params={"limit": 2}
+        ).json()
+        next_page = client.get(
+            "/api/pages/transactions",
+            headers=auth_headers,
+            params={"limit": 2, "cursor": page["next_cursor"]},
+        ).json()
+
+        assert len(page["transactions"]) == 2
+        assert len(next_page["transactions"]) == 2
+        assert next_page["next_cursor"] is None
+
+    def test_requires_auth(self, client):
+        """Test the bundle needs authentication"""
+        response = client.get("/api/pages/transactions")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestAnalyticsPage:
+    """Test the analytics page bundle"""
+
+    def test_matches_separate_endpoints(
+        self, client, auth_headers, db_session, test_user
+    ):
+        """Test the bundle returns what the three analytics endpoints return"""
+        _add_transactions(db_session, test_user)
+
+        response = client.get("/api/pages/analytics", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert page["summary"] == client.get(
+            "/api/analytics/summary", headers=auth_headers
+        ).json()
+        assert page["category_breakdown"] == client.get(
+            "/api/analytics/category-breakdown",
+            headers=auth_headers,
+            params={"type": "expense"},
+        ).json()
+        assert page["monthly_comparison"] == client.get(
+            "/api/analytics/monthly-comparison", headers=auth_headers
+        ).json()
+
+    def test_income_breakdown(self, client, auth_headers, db_session, test_user):
+        """Test breakdown_type selects the transaction type of the pie chart"""
+        _add_transactions(db_session, test_user)
+
+        page = client.get(
+            "/api/pages/analytics",
+            headers=auth_headers,
+            params={"breakdown_type": "income"},
+        ).json()
+
+        assert [c["category_name"] for c in page["category_breakdown"]] == ["Lương"]
+        assert page["summary"]["total_expense"] > 0
+
+    def test_fewer_queries_than_separate_endpoints(
+        self, client, auth_headers, db_session, test_user
+    ):
+        """Test summary and breakdown share one grouped query"""
+        from sqlalchemy import event
+        from tests.conftest import engine
+
+        _add_transactions(db_session, test_user)
+        client.get("/api/auth/me", headers=auth_headers)
+
+        def count_statements(*paths):
+            statements = []
+
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                for path in paths:
+                    response = client.get(path, headers=auth_headers)
+                    assert response.status_code == status.HTTP_200_OK
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+            return len(statements)
+
+        separate = count_statements(
+            "/api/analytics/summary",
+            "/api/analytics/category-breakdown?type=expense",
+            "/api/analytics/monthly-comparison",
+        )
+        bundled = count_statements("/api/pages/analytics")
+
+        assert bundled < separate
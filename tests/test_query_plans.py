@@ -0,0 +1,104 @@
+"""
+Query plan tests - analytics and listing queries must use the transaction indexes
+"""
+
+import pytest
+from fastapi import status
+from sqlalchemy import event
+from datetime import date, timedelta
+
+from .conftest import engine
+
+
+@pytest.fixture
+def captured_statements():
+    """Capture every SQL statement that reads the transactions table"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if (
+            "FROM transactions" in statement
+            and not statement.startswith("EXPLAIN")
+            and not executemany
+        ):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        if event.contains(engine, "before_cursor_execute", capture):
+            event.remove(engine, "before_cursor_execute", capture)
+
+
+def _transaction_scans(statement, parameters):
+    """Return plan steps that touch the transactions table"""
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).fetchall()
+    return [row[-1] for row in plan if " transactions" in row[-1]]
+
+
+def _assert_indexed(statements):
+    assert statements, "no query touched the transactions table"
+    for statement, parameters in list(statements):
+        for step in _transaction_scans(statement, parameters):
+            assert "INDEX" in step, f"full scan in plan '{step}' for:\n{statement}"
+
+
+class TestQueryPlans:
+    """EXPLAIN QUERY PLAN over the queries the routers actually send"""
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "/api/transactions/",
+            "/api/transactions/?type=expense",
+            "/api/transactions/?category_id=1",
+            "/api/transactions/?limit=5&cursor={cursor}",
+            "/api/transactions/?start_date={start}&end_date={end}",
+            "/api/analytics/summary?start_date={start}&end_date={end}",
+            "/api/analytics/category-breakdown?start_date={start}&end_date={end}&type=expense",
+            "/api/analytics/trend?start_date={start}&end_date={end}",
+            "/api/analytics/trend?start_date={start}&end_date={end}&type=income",
+            "/api/analytics/dashboard",
+            "/api/analytics/dashboard?start_date={start}&end_date={end}",
+        ],
+    )
+    def test_queries_use_indexes(
+        self, client, auth_headers, db_session, test_user, captured_statements, url
+    ):
+        """Test the query plan never falls back to a full table scan"""
+        from backend.models import Transaction, Category
+
+        category = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        today = date.today()
+        db_session.add_all(
+            Transaction(
+                amount=1000 * (i + 1),
+                description=f"Day {i}",
+                date=today - timedelta(days=i * 7),
+                type="expense",
+                category_id=category.id,
+                user_id=test_user.id,
+            )
+            for i in range(20)
+        )
+        db_session.commit()
+        captured_statements.clear()
+
+        start = today - timedelta(days=45)
+        cursor = client.get(
+            "/api/transactions/?limit=5", headers=auth_headers
+        ).headers["X-Next-Cursor"]
+        captured_statements.clear()
+
+        response = client.get(
+            url.format(start=start, end=today, cursor=cursor), headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        statements = list(captured_statements)
+        captured_statements.clear()
+        _assert_indexed(statements)
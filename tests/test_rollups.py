@@ -0,0 +1,230 @@
+"""
+Tests for monthly rollup maintenance - REQ-F-013 to REQ-F-015
+"""
+
+from fastapi import status
+from datetime import date
+
+
+def _rollup_rows(db_session, user_id):
+    from backend.models import MonthlyRollup
+
+    db_session.expire_all()
+    return {
+        (r.year, r.month, r.category_id, r.type): (r.total_amount, r.transaction_count)
+        for r in db_session.query(MonthlyRollup)
+        .filter(MonthlyRollup.user_id == user_id, MonthlyRollup.transaction_count > 0)
+        .all()
+    }
+
+
+class TestRollupMaintenance:
+    """Rollups follow every transaction write"""
+
+    def test_rollups_follow_create_update_delete(
+        self, client, auth_headers, db_session, test_user
+    ):
+        """Test rollups are updated by the transaction endpoints"""
+        from backend.models import Category
+
+        food = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        transport = (
+            db_session.query(Category).filter(Category.name == "Di chuyển").first()
+        )
+        today = date.today()
+
+        response = client.post(
+            "/api/transactions/",
+            headers=auth_headers,
+            json={
+                "amount": 50000,
+                "description": "Lunch",
+                "date": str(today),
+                "type": "expense",
+                "category_id": food.id,
+            },
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        transaction_id = response.json()["id"]
+
+        assert _rollup_rows(db_session, test_user.id) == {
+            (today.year, today.month, food.id, "expense"): (50000, 1)
+        }
+
+        response = client.put(
+            f"/api/transactions/{transaction_id}",
+            headers=auth_headers,
+            json={"amount": 70000, "category_id": transport.id},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        assert _rollup_rows(db_session, test_user.id) == {
+            (today.year, today.month, transport.id, "expense"): (70000, 1)
+        }
+
+        response = client.delete(
+            f"/api/transactions/{transaction_id}", headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        assert _rollup_rows(db_session, test_user.id) == {}
+
+    def test_summary_spanning_partial_months(
+        self, client, auth_headers, db_session, test_user
+    ):
+        """Test summaries combine rollups with partial edge months"""
+        from backend.models import Transaction, Category
+
+        category = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+
+        days = [date(2024, 1, 10), date(2024, 2, 15), date(2024, 3, 5), date(2024, 3, 25)]
+        db_session.add_all(
+            Transaction(
+                amount=10000,
+                description=f"Day {d}",
+                date=d,
+                type="expense",
+                category_id=category.id,
+                user_id=test_user.id,
+            )
+            for d in days
+        )
+        db_session.commit()
+
+        response = client.get(
+            "/api/analytics/summary?start_date=2024-01-15&end_date=2024-03-10",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total_expense"] == 20000
+
+
+class TestRollupVerification:
+    """Rebuild and drift detection"""
+
+    def test_detect_and_repair_drift(self, db_session, test_user):
+        """Test drift is reported and fixed by a rebuild"""
+        from backend import rollups
+        from backend.models import Category, MonthlyRollup, Transaction
+
+        category = db_session.query(Category).filter(Category.name == "Lương").first()
+        db_session.add(
+            Transaction(
+                amount=1000000,
+                description="Salary",
+                date=date.today(),
+                type="income",
+                category_id=category.id,
+                user_id=test_user.id,
+            )
+        )
+        db_session.commit()
+
+        assert rollups.find_rollup_drift(db_session) == []
+
+        db_session.query(MonthlyRollup).update({"total_amount": 1})
+        db_session.commit()
+
+        drift = rollups.find_rollup_drift(db_session, test_user.id)
+        assert len(drift) == 1
+        assert drift[0]["expected_amount"] == 1000000
+
+        assert rollups.rebuild_rollups(db_session, test_user.id) == 1
+        assert rollups.find_rollup_drift(db_session) == []
+
+    def test_rollup_repair_refreshes_cached_analytics(
+        self, client, auth_headers, db_session, test_user
+    ):
+        """Test a rollup rebuild bumps the data version of repaired users"""
+        from backend import rollups
+        from backend.models import Category, MonthlyRollup
+
+        category = db_session.query(Category).filter(Category.name == "Lương").first()
+        client.post(
+            "/api/transactions/",
+            headers=auth_headers,
+            json={
+                "amount": 1000000,
+                "description": "Salary",
+                "date": str(date.today()),
+                "type": "income",
+                "category_id": category.id,
+            },
+        )
+        db_session.query(MonthlyRollup).update({"total_amount": 1})
+        db_session.commit()
+
+        drifted = client.get("/api/analytics/summary", headers=auth_headers)
+        assert drifted.json()["total_income"] == 1
+
+        version = rollups.get_data_version(db_session, test_user.id)
+        rollups.rebuild_rollups(db_session)
+        assert rollups.get_data_version(db_session, test_user.id) == version + 1
+
+        response = client.get(
+            "/api/analytics/summary",
+            headers={**auth_headers, "If-None-Match": drifted.headers["ETag"]},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total_income"] == 1000000
+
+    def test_user_stats_follow_writes(self, client, auth_headers, db_session, test_user):
+        """Test user stats are updated by the transaction endpoints"""
+        from backend import rollups
+        from backend.models import Category, UserStats
+
+        category = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        response = client.post(
+            "/api/transactions/",
+            headers=auth_headers,
+            json={
+                "amount": 40000,
+                "description": "Dinner",
+                "date": str(date.today()),
+                "type": "expense",
+                "category_id": category.id,
+            },
+        )
+        transaction_id = response.json()["id"]
+
+        db_session.expire_all()
+        stats = db_session.get(UserStats, test_user.id)
+        assert (stats.total_expense, stats.transaction_count) == (40000, 1)
+
+        client.delete(f"/api/transactions/{transaction_id}", headers=auth_headers)
+
+        db_session.expire_all()
+        stats = db_session.get(UserStats, test_user.id)
+        assert (stats.total_expense, stats.transaction_count) == (0, 0)
+        assert rollups.find_user_stats_drift(db_session) == []
+
+    def test_data_version_bumps_on_every_write(self, client, auth_headers, db_session, test_user):
+        """Test edits that leave totals unchanged still bump the data version"""
+        from backend.models import Category
+        from backend.rollups import get_data_version
+
+        category = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        assert get_data_version(db_session, test_user.id) == 0
+
+        response = client.post(
+            "/api/transactions/",
+            headers=auth_headers,
+            json={
+                "amount": 15000,
+                "description": "Tea",
+                "date": str(date.today()),
+                "type": "expense",
+                "category_id": category.id,
+            },
+        )
+        db_session.expire_all()
+        assert get_data_version(db_session, test_user.id) == 1
+
+        client.put(
+            f"/api/transactions/{response.json()['id']}",
+            headers=auth_headers,
+            json={"description": "Green tea"},
+        )
+        db_session.expire_all()
+        assert get_data_version(db_session, test_user.id) == 2
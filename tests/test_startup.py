@@ -0,0 +1,88 @@
+"""
+Tests for backend import side effects, run in a fresh interpreter
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROBE = """
+import json, sys
+import backend.main
+print(json.dumps({"genai_loaded": "google.genai" in sys.modules}))
+"""
+
+# Cold import of the API relative to importing FastAPI alone, both measured
+# in the same test run, so a slow or loaded machine slows both alike. The
+# API imports about 2x FastAPI; loading the LLM SDK eagerly made it 3.5x
+IMPORT_TIME_RATIO = 4.0
+
+# Top-level entries of -X importtime output: "import time: self | cumulative | name"
+TOP_LEVEL_IMPORT = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\S.*)$")
+
+
+def _run(args, env_overrides):
+    env = {key: value for key, value in os.environ.items() if key != "GEMINI_API_KEY"}
+    env.update(env_overrides)
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def _import_backend(**env_overrides):
+    result = _run(["-c", PROBE], env_overrides)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _import_seconds(module, runs=3, **env_overrides):
+    """Best of `runs` cold imports in seconds, summed from -X importtime"""
+    timings = []
+    for _ in range(runs):
+        result = _run(["-X", "importtime", "-c", f"import {module}"], env_overrides)
+        assert result.returncode == 0, result.stderr
+        timings.append(
+            sum(
+                int(match.group(1))
+                for match in map(TOP_LEVEL_IMPORT.match, result.stderr.splitlines())
+                if match
+            )
+        )
+    return min(timings) / 1e6
+
+
+class TestStartup:
+    """Test importing the API needs no LLM credentials and builds no client"""
+
+    def test_import_without_gemini_key(self):
+        """Test the app imports with no API key and no LLM client built"""
+        probe = _import_backend(LLM_BACKEND="gemini")
+
+        assert probe["genai_loaded"] is False
+
+    def test_import_with_gemini_key_stays_lazy(self):
+        """Test a configured key does not load the SDK until first chat"""
+        # The SDK import and client construction were most of the import time
+        probe = _import_backend(LLM_BACKEND="gemini", GEMINI_API_KEY="dummy")
+
+        assert probe["genai_loaded"] is False
+
+    def test_import_time_budget(self):
+        """Test a cold import of the API stays within a multiple of FastAPI's"""
+        baseline = _import_seconds("fastapi")
+        elapsed = _import_seconds(
+            "backend.main", LLM_BACKEND="gemini", GEMINI_API_KEY="dummy"
+        )
+
+        assert elapsed < IMPORT_TIME_RATIO * baseline, (
+            f"import backend.main took {elapsed:.2f}s, "
+            f"over {IMPORT_TIME_RATIO}x import fastapi ({baseline:.2f}s)"
+        )
@@ -323,3 +323,219 @@ class TestTransactionDeletion:
             f"/api/transactions/{transaction.id}", headers=auth_headers
         )
         assert get_response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestTransactionPagination:
+    """Test keyset pagination - REQ-F-007"""
+
+    def test_cursor_pages_are_stable(self, client, auth_headers, db_session, test_user):
+        """Test cursor pages cover every row once when dates are shared"""
+        from backend.models import Transaction, Category
+
+        category = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+
+        today = date.today()
+        for i in range(7):
+            db_session.add(
+                Transaction(
+                    amount=1000 * (i + 1),
+                    description=f"Transaction {i}",
+                    date=today - timedelta(days=i // 3),
+                    type="expense",
+                    category_id=category.id,
+                    user_id=test_user.id,
+                )
+            )
+        db_session.commit()
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get(
+                "/api/transactions/", headers=auth_headers, params=params
+            )
+            assert response.status_code == status.HTTP_200_OK
+            seen.extend((t["date"], t["id"]) for t in response.json())
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert pages == 3
+        assert len(seen) == 7
+        assert seen == sorted(seen, reverse=True)
+
+    def test_skip_still_supported(self, client, auth_headers, db_session, test_user):
+        """Test offset pagination keeps working"""
+        from backend.models import Transaction, Category
+
+        category = db_session.query(Category).filter(Category.name == "Ăn uống").first()
+
+        for i in range(3):
+            db_session.add(
+                Transaction(
+                    amount=1000,
+                    description=f"Transaction {i}",
+                    date=date.today() - timedelta(days=i),
+                    type="expense",
+                    category_id=category.id,
+                    user_id=test_user.id,
+                )
+            )
+        db_session.commit()
+
+        response = client.get(
+            "/api/transactions/?skip=2&limit=5", headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [t["description"] for t in response.json()] == ["Transaction 2"]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_invalid_cursor(self, client, auth_headers):
+        """Test a malformed cursor is rejected"""
+        response = client.get(
+            "/api/transactions/?cursor=not-a-cursor", headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestTransactionExport:
+    """Test streamed transaction export - REQ-F-010"""
+
+    def _create_transactions(self, db_session, test_user):
+        from backend.models import Transaction, Category
+
+        expense_cat = (
+            db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        )
+        income_cat = db_session.query(Category).filter(Category.name == "Lương").first()
+
+        db_session.add_all(
+            [
+                Transaction(
+                    amount=50000,
+                    description="Phở, bánh mì",
+                    date=date.today(),
+                    type="expense",
+                    category_id=expense_cat.id,
+                    user_id=test_user.id,
+                ),
+                Transaction(
+                    amount=1000000,
+                    description="Salary",
+                    date=date.today() - timedelta(days=1),
+                    type="income",
+                    category_id=income_cat.id,
+                    user_id=test_user.id,
+                ),
+            ]
+        )
+        db_session.commit()
+
+    def test_export_csv(self, client, auth_headers, db_session, test_user):
+        """Test CSV export streams every matching row"""
+        import csv
+        import io
+
+        self._create_transactions(db_session, test_user)
+
+        response = client.get("/api/transactions/export", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["description"] for r in rows] == ["Phở, bánh mì", "Salary"]
+        assert rows[0]["category"] == "Ăn uống"
+
+    def test_export_ndjson_with_filter(
+        self, client, auth_headers, db_session, test_user
+    ):
+        """Test NDJSON export applies the listing filters"""
+        import json
+
+        self._create_transactions(db_session, test_user)
+
+        response = client.get(
+            "/api/transactions/export?format=ndjson&type=income", headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 1
+        assert lines[0]["amount"] == 1000000
+        assert lines[0]["category"] == "Lương"
+
+
+class TestBulkImport:
+    """Test bulk transaction import - REQ-F-006"""
+
+    def test_bulk_create_reports_row_errors(
+        self, client, auth_headers, db_session, test_user
+    ):
+        """Test valid rows are inserted and invalid ones reported"""
+        from backend.models import Category
+
+        expense_cat = (
+            db_session.query(Category).filter(Category.name == "Ăn uống").first()
+        )
+        today = str(date.today())
+
+        rows = [
+            {
+                "amount": 1000 * (i + 1),
+                "description": f"Row {i}",
+                "date": today,
+                "type": "expense",
+                "category_id": expense_cat.id,
+            }
+            for i in range(3)
+        ]
+        rows.append({**rows[0], "category_id": 99999})
+        rows.append({**rows[0], "type": "income"})
+        rows.append({**rows[0], "amount": -5})
+        rows.append({**rows[0], "category_id": None, "category": 1})
+
+        response = client.post(
+            "/api/transactions/bulk", headers=auth_headers, json={"transactions": rows}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["created"] == 3
+        assert data["failed"] == 4
+        assert [e["row"] for e in data["errors"]] == [3, 4, 5, 6]
+        assert data["errors"][0]["detail"] == "Category not found"
+        assert data["errors"][3]["detail"] == "category: Input should be a valid string"
+
+        listing = client.get("/api/transactions/", headers=auth_headers).json()
+        assert len(listing) == 3
+
+        summary = client.get("/api/analytics/summary", headers=auth_headers).json()
+        assert summary["total_expense"] == 6000
+
+    def test_bulk_import_csv(self, client, auth_headers, db_session, test_user):
+        """Test CSV upload resolves category names and reports line numbers"""
+        today = date.today()
+        content = (
+            "date,description,amount,type,category,notes\n"
+            f"{today},Cơm trưa,45000,expense,Ăn uống,\n"
+            f"{today},Lương tháng,9000000,income,Lương,Công ty\n"
+            f"{today},Không rõ,1000,expense,Không tồn tại,\n"
+        )
+
+        response = client.post(
+            "/api/transactions/bulk/csv",
+            headers=auth_headers,
+            files={"file": ("statement.csv", content.encode("utf-8"), "text/csv")},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["created"] == 2
+        assert data["errors"] == [{"row": 4, "detail": "Category not found"}]
@@ -0,0 +1,161 @@
+"""
+HTTP client for calls from the Django views to the FastAPI backend
+One pooled requests.Session per process keeps backend connections alive
+between page renders. Every call gets a timeout, idempotent calls are retried
+with backoff, and each call's latency is logged. Pages that need several
+resources fetch them concurrently with get_all(). GET responses carrying an
+ETag are kept, and revalidated with If-None-Match on the next call
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_fanout_pool = None
+_session_lock = threading.Lock()
+
+# (path, params, Authorization) -> last 200 response with an ETag
+_etag_cache = OrderedDict()
+_etag_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=settings.FASTAPI_RETRIES,
+        backoff_factor=settings.FASTAPI_RETRY_BACKOFF,
+        # Connection failures are retried for every method, since the request
+        # never reached the backend; status retries only for idempotent ones
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.FASTAPI_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Return the process-wide session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def get_fanout_pool():
+    """Return the process-wide thread pool for concurrent GETs"""
+    global _fanout_pool
+    if _fanout_pool is None:
+        with _session_lock:
+            if _fanout_pool is None:
+                _fanout_pool = ThreadPoolExecutor(
+                    max_workers=settings.FASTAPI_FANOUT_WORKERS,
+                    thread_name_prefix='api-fanout',
+                )
+    return _fanout_pool
+
+
+def request(method, path, **kwargs):
+    """
+    Call the backend at FASTAPI_BASE_URL + path
+    Accepts the keyword arguments of requests.request; raises
+    requests.RequestException when the backend cannot be reached
+    """
+    kwargs.setdefault('timeout', (settings.FASTAPI_CONNECT_TIMEOUT, settings.FASTAPI_READ_TIMEOUT))
+    started = time.perf_counter()
+    try:
+        response = get_session().request(method, f"{settings.FASTAPI_BASE_URL}{path}", **kwargs)
+    except requests.RequestException as e:
+        logger.warning(
+            "%s %s failed after %.0fms: %s",
+            method, path, (time.perf_counter() - started) * 1000, e,
+        )
+        raise
+
+    logger.info(
+        "%s %s -> %s in %.0fms",
+        method, path, response.status_code, (time.perf_counter() - started) * 1000,
+    )
+    return response
+
+
+def _etag_cache_key(path, kwargs):
+    params = kwargs.get('params') or {}
+    headers = kwargs.get('headers') or {}
+    # Responses are per user, so the credentials are part of the key
+    return (path, tuple(sorted(params.items())), headers.get('Authorization'))
+
+
+def get(path, **kwargs):
+    """
+    GET with revalidation: when a response for the same path, params and
+    credentials is kept, its ETag is sent as If-None-Match and the kept
+    response is returned on 304 Not Modified
+    """
+    key = _etag_cache_key(path, kwargs)
+    with _etag_lock:
+        cached = _etag_cache.get(key)
+
+    if cached is not None:
+        kwargs['headers'] = {**(kwargs.get('headers') or {}), 'If-None-Match': cached.headers['ETag']}
+
+    response = request('GET', path, **kwargs)
+
+    if response.status_code == 304 and cached is not None:
+        with _etag_lock:
+            if key in _etag_cache:
+                _etag_cache.move_to_end(key)
+        return cached
+
+    if response.status_code == 200 and 'ETag' in response.headers:
+        with _etag_lock:
+            _etag_cache[key] = response
+            _etag_cache.move_to_end(key)
+            while len(_etag_cache) > settings.FASTAPI_ETAG_CACHE_SIZE:
+                _etag_cache.popitem(last=False)
+    return response
+
+
+def post(path, **kwargs):
+    return request('POST', path, **kwargs)
+
+
+def put(path, **kwargs):
+    return request('PUT', path, **kwargs)
+
+
+def delete(path, **kwargs):
+    return request('DELETE', path, **kwargs)
+
+
+def get_all(*calls, **kwargs):
+    """
+    GET several resources concurrently, so a page waits for the slowest
+    call rather than the sum of them
+    Each call is a path or a (path, params) tuple; keyword arguments such as
+    headers apply to every call. Responses are returned in order, and the
+    first exception raised by a call is re-raised
+    """
+    pool = get_fanout_pool()
+    futures = []
+    for call in calls:
+        path, params = (call, None) if isinstance(call, str) else call
+        futures.append(pool.submit(get, path, params=params, **kwargs))
+    return [future.result() for future in futures]
@@ -2,11 +2,12 @@
 MoneyFlow Web Views
 """
 import json
-import requests
 from django.conf import settings
 from django.contrib import messages
 from django.shortcuts import redirect, render
 
+from . import api_client
+
 
 def index(request):
     """Home page - redirect to dashboard if logged in, else login"""
@@ -22,8 +23,8 @@ def login_view(request):
         password = request.POST.get('password')
 
         try:
-            response = requests.post(
-                f"{settings.FASTAPI_BASE_URL}/auth/login",
+            response = api_client.post(
+                "/auth/login",
                 json={"email": email, "password": password}
             )
 
@@ -55,8 +56,8 @@ def register_view(request):
             return render(request, 'web/register.html')
 
         try:
-            response = requests.post(
-                f"{settings.FASTAPI_BASE_URL}/auth/register",
+            response = api_client.post(
+                "/auth/register",
                 json={
                     "email": email,
                     "full_name": full_name,
@@ -114,8 +115,8 @@ def dashboard(request):
         print(f"DEBUG: Headers: {headers}")
         print(f"DEBUG: Params: {params}")
         
-        response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/analytics/dashboard",
+        response = api_client.get(
+            "/analytics/dashboard",
             headers=headers,
             params=params
         )
@@ -186,26 +187,18 @@ def transactions(request):
         params['end_date'] = end_date
 
     try:
-        # Get transactions
-        response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/transactions/",
-            headers=headers,
-            params=params
-        )
+        # Get transactions and the categories for the filter in one request
+        response = api_client.get("/pages/transactions", headers=headers, params=params)
 
         if response.status_code == 200:
-            transactions_data = response.json()
+            page = response.json()
+            transactions_data = page['transactions']
+            categories = page['categories']
         else:
             transactions_data = []
+            categories = []
             messages.error(request, 'Không thể tải danh sách giao dịch')
 
-        # Get categories for filter
-        cat_response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/categories/",
-            headers=headers
-        )
-        categories = cat_response.json() if cat_response.status_code == 200 else []
-
     except Exception as e:
         transactions_data = []
         categories = []
@@ -244,8 +237,8 @@ def add_transaction(request):
                 'notes': request.POST.get('notes', '')
             }
 
-            response = requests.post(
-                f"{settings.FASTAPI_BASE_URL}/transactions/",
+            response = api_client.post(
+                "/transactions/",
                 headers=headers,
                 json=transaction_data
             )
@@ -261,8 +254,8 @@ def add_transaction(request):
 
     # Get categories
     try:
-        response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/categories/",
+        response = api_client.get(
+            "/categories/",
             headers=headers
         )
         categories = response.json() if response.status_code == 200 else []
@@ -285,27 +278,13 @@ def analytics(request):
     headers = {'Authorization': f'Bearer {token}'}
 
     try:
-        # Get financial summary
-        summary_response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/analytics/summary",
-            headers=headers
-        )
-        summary = summary_response.json() if summary_response.status_code == 200 else {}
-
-        # Get category breakdown (only expenses for pie chart)
-        breakdown_response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/analytics/category-breakdown",
-            headers=headers,
-            params={'type': 'expense'}
-        )
-        breakdown = breakdown_response.json() if breakdown_response.status_code == 200 else []
-
-        # Get monthly comparison
-        monthly_response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/analytics/monthly-comparison",
-            headers=headers
-        )
-        monthly = monthly_response.json() if monthly_response.status_code == 200 else []
+        # Get financial summary, category breakdown (only expenses for pie
+        # chart) and monthly comparison in one request
+        response = api_client.get("/pages/analytics", headers=headers)
+        page = response.json() if response.status_code == 200 else {}
+        summary = page.get('summary', {})
+        breakdown = page.get('category_breakdown', [])
+        monthly = page.get('monthly_comparison', [])
 
     except Exception as e:
         summary = {}
@@ -338,10 +317,24 @@ def admin_dashboard(request):
     token = request.session.get('access_token')
     headers = {'Authorization': f'Bearer {token}'}
 
+    # Users list filters
+    search = request.GET.get('search', '')
+    is_active = request.GET.get('is_active', '')
+    is_admin = request.GET.get('is_admin', '')
+
+    params = {}
+    if search:
+        params['search'] = search
+    if is_active:
+        params['is_active'] = is_active == 'true'
+    if is_admin:
+        params['is_admin'] = is_admin == 'true'
+
     try:
-        # Get admin stats
-        stats_response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/admin/stats",
+        # Get admin stats and the users list concurrently
+        stats_response, users_response = api_client.get_all(
+            "/admin/stats",
+            ("/admin/users", params),
             headers=headers
         )
 
@@ -351,25 +344,6 @@ def admin_dashboard(request):
             stats = {}
             messages.error(request, 'Không thể tải thống kê hệ thống')
 
-        # Get users list
-        search = request.GET.get('search', '')
-        is_active = request.GET.get('is_active', '')
-        is_admin = request.GET.get('is_admin', '')
-
-        params = {}
-        if search:
-            params['search'] = search
-        if is_active:
-            params['is_active'] = is_active == 'true'
-        if is_admin:
-            params['is_admin'] = is_admin == 'true'
-
-        users_response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/admin/users",
-            headers=headers,
-            params=params
-        )
-
         if users_response.status_code == 200:
             users = users_response.json()
         else:
@@ -417,8 +391,8 @@ def admin_user_detail(request, user_id):
         }
 
         try:
-            response = requests.put(
-                f"{settings.FASTAPI_BASE_URL}/admin/users/{user_id}",
+            response = api_client.put(
+                f"/admin/users/{user_id}",
                 headers=headers,
                 json=data
             )
@@ -434,8 +408,8 @@ def admin_user_detail(request, user_id):
 
     try:
         # Get user details
-        response = requests.get(
-            f"{settings.FASTAPI_BASE_URL}/admin/users/{user_id}",
+        response = api_client.get(
+            f"/admin/users/{user_id}",
             headers=headers
         )
 
@@ -471,8 +445,8 @@ def admin_delete_user(request, user_id):
         headers = {'Authorization': f'Bearer {token}'}
 
         try:
-            response = requests.delete(
-                f"{settings.FASTAPI_BASE_URL}/admin/users/{user_id}",
+            response = api_client.delete(
+                f"/admin/users/{user_id}",
                 headers=headers
             )
 
@@ -493,4 +467,7 @@ def chatbot_view(request):
         messages.error(request, 'Vui lòng đăng nhập để sử dụng chatbot')
         return redirect('login')
 
-    return render(request, 'web/chatbot.html')
\ No newline at end of file
+    # The page streams answers straight from the API over Server-Sent Events
+    return render(request, 'web/chatbot.html', {
+        'api_base_url': settings.FASTAPI_BASE_URL,
+    })
\ No newline at end of file